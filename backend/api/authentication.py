@@ -0,0 +1,85 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils.functional import SimpleLazyObject
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+User = get_user_model()
+REVOKED_KEY = 'tokens:revoked:{}'
+
+
+class LazyUser(SimpleLazyObject):
+    """Пользователь из токена, загружаемый из базы при первой надобности.
+
+    id и признак аутентификации известны из токена, поэтому проверки прав
+    и фильтры по пользователю обходятся без запроса.
+    """
+
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, user_id):
+        super().__init__(lambda: self.load(user_id))
+        self.__dict__['pk'] = user_id
+
+    def __bool__(self):
+        """Пользователь из токена есть всегда."""
+        return True
+
+    @property
+    def id(self):
+        """id пользователя из токена."""
+        return self.pk
+
+    @staticmethod
+    def load(user_id):
+        """Активный пользователь с id из токена."""
+        user = User.objects.filter(pk=user_id, is_active=True).first()
+        if user is None:
+            raise AuthenticationFailed('Пользователь не найден.')
+        return user
+
+
+def issue_token(user):
+    """Подписанный короткоживущий токен доступа с id пользователя."""
+    return str(AccessToken.for_user(user))
+
+
+def revoke_token(token):
+    """Отзывает токен до конца срока его действия."""
+    timeout = token['exp'] - int(time.time())
+    if timeout > 0:
+        cache.set(
+            REVOKED_KEY.format(token[api_settings.JTI_CLAIM]), True, timeout
+        )
+
+
+def is_revoked(token):
+    """Отозван ли токен."""
+    return bool(cache.get(REVOKED_KEY.format(token[api_settings.JTI_CLAIM])))
+
+
+class SignedTokenAuthentication(TokenAuthentication):
+    """Аутентификация по заголовку ``Authorization: Token <токен>``.
+
+    Подписанный токен проверяется без запросов к базе: id пользователя
+    берётся из токена, список отозванных токенов хранится в кэше Django.
+    Токены из таблицы authtoken_token по-прежнему принимаются.
+    """
+
+    def authenticate_credentials(self, key):
+        """Пользователь и токен по ключу из заголовка."""
+        if key.count('.') != 2:
+            return super().authenticate_credentials(key)
+        try:
+            token = AccessToken(key)
+        except TokenError:
+            raise AuthenticationFailed('Недействительный токен.')
+        if is_revoked(token):
+            raise AuthenticationFailed('Токен отозван.')
+        return LazyUser(token[api_settings.USER_ID_CLAIM]), token
@@ -0,0 +1,48 @@
+from bisect import bisect_left, bisect_right
+
+from food.models import Ingredient
+from foodgram_backend.db.routers import primary
+
+from .cache import get_catalog_version
+
+# Символ, который сортируется после любого другого: граница диапазона ключей.
+MAX_CHAR = '\U0010ffff'
+
+# Индекс продуктов процесса: (версия каталога, индекс).
+_ingredient_index = (None, None)
+
+
+class PrefixIndex:
+    """Отсортированный по названию индекс для автодополнения.
+
+    Поиск по префиксу — два двоичных поиска по отсортированным ключам,
+    совпадения по подстроке идут после совпадений по префиксу.
+    """
+
+    def __init__(self, rows):
+        self.rows = sorted(rows, key=lambda row: row['name'].lower())
+        self.keys = [row['name'].lower() for row in self.rows]
+
+    def search(self, query):
+        """Строки, название которых начинается с query или содержит его."""
+        query = query.lower()
+        start = bisect_left(self.keys, query)
+        end = bisect_right(self.keys, query + MAX_CHAR, lo=start)
+        return self.rows[start:end] + [
+            row for index, (key, row) in enumerate(zip(self.keys, self.rows))
+            if query in key and not start <= index < end
+        ]
+
+
+def get_ingredient_index():
+    """Индекс продуктов, перестраиваемый при смене версии каталога."""
+    global _ingredient_index
+    version = get_catalog_version('ingredients')
+    index_version, index = _ingredient_index
+    if index_version != version:
+        with primary():
+            index = PrefixIndex(
+                Ingredient.objects.values('id', 'name', 'measurement_unit')
+            )
+        _ingredient_index = (version, index)
+    return index
@@ -0,0 +1,178 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
+from rest_framework.renderers import JSONRenderer
+
+from food.models import Ingredient, Tag
+from foodgram_backend.db.routers import primary
+
+CATALOG_VERSION_KEY = 'catalog:{}:version'
+CATALOGS = {Tag: 'tags', Ingredient: 'ingredients'}
+RECIPES_GENERATION_KEY = 'recipes:generation'
+RESPONSE_KEY = 'response:{}:{}'
+# Параметры, от которых зависит ответ со списком рецептов.
+RECIPE_QUERY_PARAMS = (
+    'author', 'cursor', 'is_favorited', 'is_in_shopping_cart', 'limit',
+    'page', 'search', 'tags'
+)
+
+# Сериализованные каталоги процесса: {имя: (версия, тело ответа)}.
+_catalogs = {}
+
+
+def get_version(key, store=cache):
+    """Текущее значение счётчика версии из общего кэша Django.
+
+    Версия хранится в общем кэше, поэтому её увеличение в одном процессе
+    видно всем остальным. Начальное значение берётся из времени, чтобы
+    после вытеснения ключа версия не совпала с уже использованной.
+    """
+    store.add(key, time.time_ns(), timeout=None)
+    return store.get(key)
+
+
+def bump_version(key, store=cache):
+    """Увеличивает счётчик версии."""
+    try:
+        store.incr(key)
+    except ValueError:
+        store.set(key, time.time_ns(), timeout=None)
+
+
+def get_catalog_version(name):
+    """Текущая версия каталога."""
+    return get_version(CATALOG_VERSION_KEY.format(name))
+
+
+def invalidate_catalog(name):
+    """Увеличивает версию каталога после изменения его данных."""
+    bump_version(CATALOG_VERSION_KEY.format(name))
+
+
+def catalog_response(request, name, serialize):
+    """Ответ с каталогом из кэша с поддержкой If-None-Match.
+
+    ``serialize`` вызывается только при смене версии каталога и должен
+    вернуть данные для JSONRenderer.
+    """
+    version = get_catalog_version(name)
+    etag = f'"{name}-{version}"'
+    if etag in parse_etags(request.headers.get('If-None-Match', '')):
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        return response
+    cached_version, body = _catalogs.get(name, (None, None))
+    if cached_version != version:
+        with primary():
+            body = JSONRenderer().render(serialize())
+        _catalogs[name] = (version, body)
+    response = HttpResponse(body, content_type='application/json')
+    response['ETag'] = etag
+    return response
+
+
+def invalidate_recipe_responses():
+    """Увеличивает поколение кэшированных ответов с рецептами."""
+    bump_version(RECIPES_GENERATION_KEY, caches['responses'])
+
+
+def request_fingerprint(request):
+    """Адрес, формат и нормализованные параметры запроса к рецептам."""
+    params = sorted(
+        (name, sorted(values))
+        for name, values in request.query_params.lists()
+        if name in RECIPE_QUERY_PARAMS
+    )
+    return '|'.join((
+        request.build_absolute_uri(request.path),
+        request.accepted_renderer.format,
+        repr(params),
+    ))
+
+
+def response_cache_key(request):
+    """Ключ ответа: поколение рецептов и отпечаток запроса."""
+    return RESPONSE_KEY.format(
+        get_version(RECIPES_GENERATION_KEY, caches['responses']),
+        hashlib.sha256(request_fingerprint(request).encode()).hexdigest()
+    )
+
+
+def not_modified(request, response):
+    """Ответ 304 вместо response, если у клиента та же версия."""
+    last_modified = parse_http_date_safe(response.get('Last-Modified', ''))
+    return get_conditional_response(
+        request,
+        etag=response.get('ETag'),
+        last_modified=last_modified,
+        response=response
+    )
+
+
+def conditional_response(request, etag, last_modified, get_response):
+    """Ответ с ETag и Last-Modified, при совпадении версий — 304.
+
+    ``get_response`` вызывается, только если у клиента устаревшая версия.
+    Без ``etag`` (объект не найден) запрос обрабатывается как обычно.
+    """
+    if etag is None:
+        return get_response()
+    headers = {'ETag': f'"{etag}"'}
+    if last_modified is not None:
+        headers['Last-Modified'] = http_date(last_modified.timestamp())
+    response = not_modified(request, HttpResponse(headers=headers))
+    if response.status_code == 200:
+        response = get_response()
+        if response.status_code == 200:
+            for header, value in headers.items():
+                response[header] = value
+    return response
+
+
+def cached_response(request, get_response):
+    """Ответ анонимному пользователю из кэша ответов.
+
+    Ответы одинаковы для всех анонимных пользователей, поэтому успешный
+    ответ сохраняется целиком вместе с ETag и Last-Modified и отдаётся без
+    фильтрации и сериализации, пока не сменится поколение рецептов. Ответ
+    для кэша строится по основной базе, а не по отстающей реплике.
+    """
+    timeout = settings.RESPONSE_CACHE_TIMEOUT
+    if not timeout or request.user.is_authenticated:
+        return get_response()
+    responses = caches['responses']
+    key = response_cache_key(request)
+    cached = responses.get(key)
+    if cached is not None:
+        content, headers = cached
+        response = HttpResponse(content)
+        for header, value in headers.items():
+            response[header] = value
+        return not_modified(request, response)
+    with primary():
+        response = get_response()
+
+    def store(rendered):
+        responses.set(
+            key,
+            (
+                rendered.content,
+                {
+                    header: rendered[header]
+                    for header in ('Content-Type', 'ETag', 'Last-Modified')
+                    if rendered.has_header(header)
+                }
+            ),
+            timeout
+        )
+
+    if response.status_code == 200 and hasattr(
+        response, 'add_post_render_callback'
+    ):
+        response.add_post_render_callback(store)
+    return response
@@ -4,7 +4,11 @@ from food.models import Ingredient, Recipe, Tag
 
 
 class IngredientFilter(FilterSet):
-    """Фильтр продуктов."""
+    """Фильтр продуктов.
+
+    Используется, когда поиск по индексу в памяти отключён; на PostgreSQL
+    поиск по префиксу опирается на индекс по UPPER(name).
+    """
 
     name = filters.CharFilter(lookup_expr='istartswith')
 
@@ -25,21 +29,30 @@ class RecipeFilter(FilterSet):
     )
     is_favorited = filters.BooleanFilter(method='filter_favorites')
     is_in_shopping_cart = filters.BooleanFilter(method='filter_shoppingcarts')
+    search = filters.CharFilter(method='filter_search')
 
     class Meta:
         """Метаданные фильтра."""
 
         model = Recipe
-        fields = ('author', 'tags', 'is_favorited', 'is_in_shopping_cart')
+        fields = (
+            'author', 'tags', 'is_favorited', 'is_in_shopping_cart', 'search'
+        )
 
     def filter_favorites(self, recipes, name, value):
         """Фильтр избранных рецептов."""
         if self.request.user.is_authenticated and value:
-            return recipes.filter(favorites__user=self.request.user)
+            return recipes.filter(favorites__user=self.request.user.pk)
         return recipes
 
     def filter_shoppingcarts(self, recipes, name, value):
         """Фильтр списка покупок."""
         if self.request.user.is_authenticated and value:
-            return recipes.filter(shoppingcarts__user=self.request.user)
+            return recipes.filter(
+                shoppingcarts__user=self.request.user.pk
+            )
         return recipes
+
+    def filter_search(self, recipes, name, value):
+        """Полнотекстовый поиск по названию, описанию и продуктам."""
+        return recipes.search(value)
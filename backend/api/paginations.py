@@ -1,5 +1,132 @@
+import base64
+import binascii
+import json
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 
 
 class PageSizeLimitPagination(PageNumberPagination):
+    """Постраничный вывод с размером страницы из параметра limit.
+
+    Если у класса задан ``cursor_ordering``, то при наличии в запросе
+    параметра ``cursor`` (пустого для первой страницы) включается вывод по
+    ключу: следующая страница выбирается условием по полям сортировки,
+    без OFFSET и без подсчёта общего числа объектов.
+    """
+
     page_size_query_param = 'limit'
+    cursor_query_param = 'cursor'
+    cursor_ordering = None
+    invalid_cursor_message = 'Неверный курсор'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """Выбирает страницу по номеру или по курсору."""
+        self.cursor_mode = (
+            self.cursor_ordering is not None
+            and self.cursor_query_param in request.query_params
+        )
+        if not self.cursor_mode:
+            return super().paginate_queryset(queryset, request, view)
+        self.request = request
+        self.fields = [
+            queryset.model._meta.get_field(name.lstrip('-'))
+            for name in self.cursor_ordering
+        ]
+        queryset = queryset.order_by(*self.cursor_ordering)
+        position = self.decode_cursor(request)
+        if position is not None:
+            queryset = queryset.filter(self.after(position))
+        page_size = self.get_page_size(request)
+        page = list(queryset[:page_size + 1])
+        self.next_position = None
+        if len(page) > page_size:
+            page = page[:page_size]
+            self.next_position = [
+                field.value_to_string(page[-1]) for field in self.fields
+            ]
+        return page
+
+    def after(self, position):
+        """Условие «строго после позиции» для составного ключа сортировки."""
+        conditions = []
+        for index, name in enumerate(self.cursor_ordering):
+            lookup = 'lt' if name.startswith('-') else 'gt'
+            conditions.append(Q(
+                **{
+                    field.name: value
+                    for field, value in zip(
+                        self.fields[:index], position[:index]
+                    )
+                },
+                **{f'{self.fields[index].name}__{lookup}': position[index]}
+            ))
+        return reduce(or_, conditions)
+
+    def decode_cursor(self, request):
+        """Позиция из параметра cursor или None для первой страницы."""
+        encoded = request.query_params[self.cursor_query_param]
+        if not encoded:
+            return None
+        try:
+            values = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            if len(values) != len(self.fields):
+                raise ValueError
+            return [
+                field.to_python(value)
+                for field, value in zip(self.fields, values)
+            ]
+        except (binascii.Error, TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_cursor_link(self):
+        """Ссылка на следующую страницу по курсору."""
+        if self.next_position is None:
+            return None
+        url = remove_query_param(
+            self.request.build_absolute_uri(), self.page_query_param
+        )
+        return replace_query_param(
+            url,
+            self.cursor_query_param,
+            base64.urlsafe_b64encode(
+                json.dumps(self.next_position).encode()
+            ).decode()
+        )
+
+    def get_page_state(self):
+        """Всё, кроме самих объектов, от чего зависит ответ со страницей.
+
+        Для вывода по ключу это позиция следующей страницы, для
+        постраничного — номер страницы и уже подсчитанное общее число.
+        """
+        if self.cursor_mode:
+            return repr(self.next_position)
+        return f'{self.page.number}/{self.page.paginator.count}'
+
+    def get_paginated_response(self, data):
+        """Ответ со списком объектов и ссылками на соседние страницы."""
+        if not self.cursor_mode:
+            return super().get_paginated_response(data)
+        return Response({
+            'next': self.get_next_cursor_link(),
+            'results': data,
+        })
+
+
+class RecipePagination(PageSizeLimitPagination):
+    """Постраничный вывод рецептов, по ключу — от новых к старым."""
+
+    cursor_ordering = ('-pub_date', '-id')
+
+
+class UserPagination(PageSizeLimitPagination):
+    """Постраничный вывод пользователей, по ключу — по адресу почты."""
+
+    cursor_ordering = ('email', 'id')
@@ -0,0 +1,72 @@
+from functools import partial
+
+from django.conf import settings
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.parsers import BaseParser, DataAndFiles
+
+from food.uploads import TemporaryImageFile
+
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+
+class PayloadTooLarge(APIException):
+    """Тело запроса больше допустимого."""
+
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = 'Размер файла превышает допустимый'
+    default_code = 'payload_too_large'
+
+
+class ImageUploadParser(BaseParser):
+    """Изображение, переданное телом запроса целиком.
+
+    Тело пишется во временный файл частями и попадает в поле
+    ``upload_field`` представления. Запрос с Content-Length больше
+    ``MAX_IMAGE_UPLOAD_SIZE`` отклоняется до чтения тела.
+    """
+
+    media_type = 'image/*'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        """Сохраняет тело запроса во временный файл."""
+        limit = settings.MAX_IMAGE_UPLOAD_SIZE
+        meta = parser_context['request'].META
+        try:
+            content_length = int(meta.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            content_length = 0
+        if content_length > limit:
+            raise PayloadTooLarge
+        file = TemporaryImageFile(media_type)
+        if stream is not None:
+            for chunk in iter(partial(stream.read, UPLOAD_CHUNK_SIZE), b''):
+                if file.tell() + len(chunk) > limit:
+                    file.close()
+                    raise PayloadTooLarge
+                file.write(chunk)
+        file.size = file.tell()
+        file.seek(0)
+        return DataAndFiles(
+            {}, {parser_context['view'].upload_field: file}
+        )
+
+
+class NDJSONParser(BaseParser):
+    """Тело запроса в формате NDJSON: один объект JSON в строке.
+
+    Вместо разобранных данных возвращает ленивый итератор строк, который
+    читает тело по мере обработки, поэтому запрос не держится в памяти
+    целиком.
+    """
+
+    media_type = 'application/x-ndjson'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        """Итератор строк тела запроса."""
+        encoding = (parser_context or {}).get(
+            'encoding', settings.DEFAULT_CHARSET
+        )
+        if stream is None:
+            return iter(())
+        return (line.decode(encoding, 'replace') for line in stream)
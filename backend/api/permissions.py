@@ -8,5 +8,5 @@ class IsAuthorOrReadOnly(permissions.BasePermission):
         """Проверка на автора рецепта."""
         return (
             request.method in permissions.SAFE_METHODS
-            or recipe.author == request.user
+            or recipe.author_id == request.user.pk
         )
@@ -0,0 +1,99 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import CharField, Value
+from django.utils.functional import cached_property
+
+from food.models import Favorite, ShoppingCart, Subscription
+
+from .cache import bump_version, get_version
+
+RELATIONS_VERSION_KEY = 'relations:{}:version'
+RELATIONS_KEY = 'relations:{}:{}'
+FAVORITES = 'favorites'
+SHOPPING_CART = 'shopping_cart'
+SUBSCRIPTIONS = 'subscriptions'
+KINDS = (FAVORITES, SHOPPING_CART, SUBSCRIPTIONS)
+
+
+class UserRelations:
+    """Избранное, корзина и подписки пользователя в виде множеств id.
+
+    Все три множества читаются одним запросом при первом обращении и
+    живут до конца запроса. Если задан ``RELATIONS_CACHE_TIMEOUT``, они
+    хранятся и между запросами в общем кэше под версией пользователя,
+    которую увеличивают сигналы при изменении его связей.
+    """
+
+    def __init__(self, user):
+        self.user = user
+
+    @classmethod
+    def for_request(cls, request):
+        """Связи пользователя запроса, загружаемые один раз за запрос."""
+        relations = getattr(request, '_user_relations', None)
+        if relations is None:
+            relations = cls(request.user)
+            request._user_relations = relations
+        return relations
+
+    def load(self):
+        """Читает множества связей пользователя из базы."""
+        kind = CharField()
+        rows = Favorite.objects.filter(user=self.user.pk).annotate(
+            kind=Value(FAVORITES, kind)
+        ).values_list('kind', 'recipe_id').union(
+            ShoppingCart.objects.filter(user=self.user.pk).annotate(
+                kind=Value(SHOPPING_CART, kind)
+            ).values_list('kind', 'recipe_id'),
+            Subscription.objects.filter(user=self.user.pk).annotate(
+                kind=Value(SUBSCRIPTIONS, kind)
+            ).values_list('kind', 'author_id'),
+            all=True
+        )
+        sets = {name: set() for name in KINDS}
+        for name, pk in rows:
+            sets[name].add(pk)
+        return {name: frozenset(ids) for name, ids in sets.items()}
+
+    @cached_property
+    def sets(self):
+        """Множества связей: из кэша, если он включён, иначе из базы."""
+        if not self.user.is_authenticated:
+            return {name: frozenset() for name in KINDS}
+        timeout = settings.RELATIONS_CACHE_TIMEOUT
+        if not timeout:
+            return self.load()
+        key = RELATIONS_KEY.format(
+            self.user.pk,
+            get_version(RELATIONS_VERSION_KEY.format(self.user.pk))
+        )
+        sets = cache.get(key)
+        if sets is None:
+            sets = self.load()
+            cache.set(key, sets, timeout)
+        return sets
+
+    def digest(self):
+        """Отпечаток связей для ETag ответов с отметками пользователя."""
+        return hashlib.sha256(repr([
+            sorted(self.sets[name]) for name in KINDS
+        ]).encode()).hexdigest()
+
+    def is_favorited(self, recipe):
+        """Рецепт в избранном пользователя."""
+        return recipe.pk in self.sets[FAVORITES]
+
+    def is_in_shopping_cart(self, recipe):
+        """Рецепт в корзине пользователя."""
+        return recipe.pk in self.sets[SHOPPING_CART]
+
+    def is_subscribed(self, author):
+        """Пользователь подписан на автора."""
+        return author.pk in self.sets[SUBSCRIPTIONS]
+
+
+def invalidate_relations(user_id):
+    """Увеличивает версию связей пользователя после их изменения."""
+    bump_version(RELATIONS_VERSION_KEY.format(user_id))
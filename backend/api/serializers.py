@@ -1,27 +1,102 @@
 from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.files.uploadedfile import UploadedFile
 from django.db import transaction
 from djoser.serializers import UserSerializer as DjoserUserSerializer
 from drf_extra_fields.fields import Base64ImageField
 from rest_framework import serializers
 
-from food.constants import MIN_AMOUNT, MIN_COOKING_TIME
-from food.models import (
-    AmountIngredient,
-    Favorite,
-    Ingredient,
-    Recipe,
-    ShoppingCart,
-    Subscription,
-    Tag
+from food.constants import (
+    AVATAR_RENDITIONS,
+    IMAGE_RENDITIONS,
+    MIN_AMOUNT,
+    MIN_COOKING_TIME
 )
+from food.models import AmountIngredient, Ingredient, Recipe, Tag
+from food.storage import release_on_commit
+from food.uploads import decode_base64_upload, prepare_image
+
+from .relations import UserRelations
 
 User = get_user_model()
 
 
+def get_relations(context):
+    """Связи пользователя запроса из контекста сериализатора."""
+    request = context.get('request')
+    if request is None:
+        return UserRelations(AnonymousUser())
+    return UserRelations.for_request(request)
+
+
+class RenditionsField(serializers.Field):
+    """Ссылки на уменьшенные копии изображения.
+
+    Пока копии текущего файла не построены, вместо них отдаётся ссылка
+    на исходный файл.
+    """
+
+    def __init__(self, image_field, sizes, **kwargs):
+        self.image_field = image_field
+        self.sizes = sizes
+        super().__init__(source='*', read_only=True, **kwargs)
+
+    def get_url(self, instance, rendition):
+        """Ссылка на копию или на исходный файл."""
+        file = getattr(instance, self.image_field)
+        renditions = getattr(instance, f'{self.image_field}_renditions')
+        if renditions.get('source') != file.name:
+            renditions = {}
+        url = file.storage.url(renditions.get(rendition, file.name))
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+
+    def to_representation(self, instance):
+        """Ссылки на все копии изображения."""
+        if not getattr(instance, self.image_field):
+            return None
+        return {
+            rendition: self.get_url(instance, rendition)
+            for rendition in self.sizes
+        }
+
+
+class RenditionField(RenditionsField):
+    """Ссылка на одну уменьшенную копию изображения."""
+
+    def __init__(self, image_field, rendition, **kwargs):
+        self.rendition = rendition
+        super().__init__(image_field, (rendition,), **kwargs)
+
+    def to_representation(self, instance):
+        """Ссылка на копию изображения."""
+        if not getattr(instance, self.image_field):
+            return None
+        return self.get_url(instance, self.rendition)
+
+
+class UploadImageField(serializers.ImageField):
+    """Изображение из строки base64 или из загруженного файла.
+
+    Строка base64 декодируется частями во временный файл, файл из
+    multipart-формы или тела запроса используется как есть.
+    """
+
+    def to_internal_value(self, data):
+        """Проверка и подготовка изображения."""
+        if isinstance(data, str):
+            data = decode_base64_upload(data)
+        elif not isinstance(data, UploadedFile):
+            raise serializers.ValidationError(
+                'Ожидается файл или строка base64'
+            )
+        return super().to_internal_value(prepare_image(data))
+
+
 class ImageSerializer(serializers.ModelSerializer):
     """Сериализатор изображения."""
 
-    avatar = Base64ImageField(required=True, allow_null=False)
+    avatar = UploadImageField(required=True, allow_null=False)
 
     class Meta:
         """Мета класс."""
@@ -37,12 +112,18 @@ class ImageSerializer(serializers.ModelSerializer):
             )
         return data
 
+    def update(self, instance, validated_data):
+        """Замена аватара с освобождением прежнего файла."""
+        release_on_commit(instance, 'avatar')
+        return super().update(instance, validated_data)
+
 
 class UserSerializer(DjoserUserSerializer):
     """Сериализатор пользователя."""
 
     is_subscribed = serializers.SerializerMethodField(read_only=True)
     avatar = Base64ImageField(read_only=True)
+    avatar_renditions = RenditionsField('avatar', AVATAR_RENDITIONS)
 
     class Meta(DjoserUserSerializer.Meta):
         """Мета класс."""
@@ -50,21 +131,14 @@ class UserSerializer(DjoserUserSerializer):
         fields = (
             *DjoserUserSerializer.Meta.fields,
             'avatar',
+            'avatar_renditions',
             'is_subscribed'
         )
         extra_kwargs = {'password': {'write_only': True}}
 
     def get_is_subscribed(self, author):
         """Проверка подписки."""
-        request = self.context.get('request')
-        return (
-            request is not None
-            and request.user.is_authenticated
-            and Subscription.objects.filter(
-                user=request.user,
-                author=author
-            ).exists()
-        )
+        return get_relations(self.context).is_subscribed(author)
 
 
 class IngredientSerializer(serializers.ModelSerializer):
@@ -88,13 +162,13 @@ class TagSerializer(serializers.ModelSerializer):
 
 
 class AmountIngredientSerializer(serializers.ModelSerializer):
-    """Сериализатор ингредиента."""
+    """Сериализатор ингредиента.
 
-    id = serializers.PrimaryKeyRelatedField(
-        queryset=Ingredient.objects.values_list('id', flat=True),
-        required=True,
-        allow_null=False
-    )
+    Существование продуктов проверяется одним запросом для всего рецепта
+    в ``RecipeCreateUpdateSerializer.validate``.
+    """
+
+    id = serializers.IntegerField(required=True, allow_null=False)
 
     class Meta:
         """Мета класс."""
@@ -143,6 +217,7 @@ class RecipeSerializer(serializers.ModelSerializer):
     author = UserSerializer()
     is_favorited = serializers.SerializerMethodField(read_only=True)
     is_in_shopping_cart = serializers.SerializerMethodField(read_only=True)
+    image_renditions = RenditionsField('image', IMAGE_RENDITIONS)
 
     class Meta:
         """Мета класс."""
@@ -157,33 +232,18 @@ class RecipeSerializer(serializers.ModelSerializer):
             'is_in_shopping_cart',
             'name',
             'image',
+            'image_renditions',
             'text',
             'cooking_time'
         )
 
     def get_is_favorited(self, recipe):
         """Проверка нахождения рецепта в избранном."""
-        request = self.context.get('request')
-        return (
-            request is not None
-            and request.user.is_authenticated
-            and Favorite.objects.filter(
-                user=request.user,
-                recipe=recipe
-            ).exists()
-        )
+        return get_relations(self.context).is_favorited(recipe)
 
     def get_is_in_shopping_cart(self, recipe):
         """Проверка нахождения рецепта в корзине."""
-        request = self.context.get('request')
-        return (
-            request is not None
-            and request.user.is_authenticated
-            and ShoppingCart.objects.filter(
-                user=request.user,
-                recipe=recipe
-            ).exists()
-        )
+        return get_relations(self.context).is_in_shopping_cart(recipe)
 
 
 class RecipeCreateUpdateSerializer(serializers.ModelSerializer):
@@ -192,10 +252,10 @@ class RecipeCreateUpdateSerializer(serializers.ModelSerializer):
     ingredients = AmountIngredientSerializer(
         many=True, required=True, allow_empty=False
     )
-    tags = serializers.PrimaryKeyRelatedField(
-        queryset=Tag.objects.all(), many=True, allow_empty=False
+    tags = serializers.ListField(
+        child=serializers.IntegerField(), allow_empty=False
     )
-    image = Base64ImageField(required=True, allow_null=False)
+    image = UploadImageField(required=True, allow_null=False)
     cooking_time = serializers.IntegerField(min_value=MIN_COOKING_TIME)
 
     class Meta:
@@ -230,6 +290,20 @@ class RecipeCreateUpdateSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(
                 {'tags': 'Тэги должны быть уникальны'}
             )
+        found = {
+            'ingredients': Ingredient.objects.only('id').in_bulk(ingredients),
+            'tags': Tag.objects.in_bulk(tags),
+        }
+        errors = {
+            field: 'Не найдены id: {}'.format(
+                ', '.join(str(pk) for pk in ids if pk not in found[field])
+            )
+            for field, ids in (('ingredients', ingredients), ('tags', tags))
+            if len(found[field]) != len(ids)
+        }
+        if errors:
+            raise serializers.ValidationError(errors)
+        data['tags'] = [found['tags'][pk] for pk in tags]
         return data
 
     def validate_image(self, image):
@@ -261,27 +335,84 @@ class RecipeCreateUpdateSerializer(serializers.ModelSerializer):
                 'author': self.context['request'].user
             }
         )
-        recipe.tags.set(tags_data)
+        self.update_tags(recipe, tags_data)
         self.create_amount_ingredients(recipe, ingredients_data)
         return recipe
 
+    def update_amount_ingredients(self, recipe, ingredients):
+        """Изменение ингредиентов рецепта.
+
+        Новые продукты добавляются, изменённые количества обновляются,
+        убранные продукты удаляются, остальные строки не затрагиваются.
+        """
+        amounts = {
+            amount.ingredient_id: amount for amount in recipe.amounts.all()
+        }
+        created = []
+        changed = []
+        for ingredient in ingredients:
+            amount = amounts.pop(ingredient['id'], None)
+            if amount is None:
+                created.append(AmountIngredient(
+                    recipe=recipe,
+                    ingredient_id=ingredient['id'],
+                    amount=ingredient['amount']
+                ))
+            elif amount.amount != ingredient['amount']:
+                amount.amount = ingredient['amount']
+                changed.append(amount)
+        if amounts:
+            AmountIngredient.objects.filter(
+                pk__in=[amount.pk for amount in amounts.values()]
+            ).delete()
+        if changed:
+            AmountIngredient.objects.bulk_update(changed, ('amount',))
+        if created:
+            AmountIngredient.objects.bulk_create(created)
+
+    def update_tags(self, recipe, tags):
+        """Изменение тэгов рецепта без пересоздания оставшихся связей."""
+        current = {tag.pk for tag in recipe.tags.all()}
+        new = {tag.pk for tag in tags}
+        RecipeTag = Recipe.tags.through
+        if current - new:
+            RecipeTag.objects.filter(
+                recipe=recipe, tag_id__in=current - new
+            ).delete()
+        if new - current:
+            RecipeTag.objects.bulk_create(
+                RecipeTag(recipe=recipe, tag_id=pk) for pk in new - current
+            )
+
     @transaction.atomic
     def update(self, instance, validated_data):
         """Обновление рецепта."""
-        tags_data = validated_data.pop('tags')
-        ingredients_data = validated_data.pop('ingredients')
-        instance.ingredients.clear()
-        self.create_amount_ingredients(instance, ingredients_data)
-        instance.tags.set(tags_data)
+        if 'image' in validated_data:
+            release_on_commit(instance, 'image')
+        if 'ingredients' in validated_data:
+            self.update_amount_ingredients(
+                instance, validated_data.pop('ingredients')
+            )
+        if 'tags' in validated_data:
+            self.update_tags(instance, validated_data.pop('tags'))
         return super().update(instance, validated_data)
 
     def to_representation(self, instance):
         """Представление рецепта."""
-        return RecipeSerializer(instance, context=self.context).data
+        return RecipeSerializer(
+            Recipe.objects.for_read().get(pk=instance.pk),
+            context=self.context
+        ).data
 
 
 class SummaryRecipeSerializer(serializers.ModelSerializer):
-    """Сериализатор рецепта."""
+    """Сериализатор рецепта.
+
+    Вместо исходного изображения отдаёт его уменьшенную копию.
+    """
+
+    image = RenditionField('image', 'thumbnail')
+    image_renditions = RenditionsField('image', IMAGE_RENDITIONS)
 
     class Meta:
         """Мета класс."""
@@ -291,19 +422,23 @@ class SummaryRecipeSerializer(serializers.ModelSerializer):
             'id',
             'name',
             'image',
+            'image_renditions',
             'cooking_time'
         )
 
 
 class SubscribeSerializer(UserSerializer):
-    """Сериализатор подписки."""
+    """Сериализатор подписки.
+
+    Ожидает авторов из ``User.objects.for_subscriptions``.
+    """
 
-    recipes = serializers.SerializerMethodField()
-    recipes_count = serializers.IntegerField(
-        source='recipes.count',
+    recipes = SummaryRecipeSerializer(
+        source='preview_recipes',
+        many=True,
         read_only=True
     )
-    is_subscribed = serializers.BooleanField(default=False)
+    recipes_count = serializers.IntegerField(read_only=True)
 
     class Meta(UserSerializer.Meta):
         """Мета класс."""
@@ -313,13 +448,3 @@ class SubscribeSerializer(UserSerializer):
             'recipes',
             'recipes_count'
         )
-
-    def get_recipes(self, user):
-        """Получение рецептов."""
-        return SummaryRecipeSerializer(
-            user.recipes.all()[
-                :int(self.context.get(
-                    'request'
-                ).query_params.get('recipes_limit', 10**10))
-            ], many=True
-        ).data
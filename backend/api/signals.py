@@ -0,0 +1,90 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from food.models import (
+    AmountIngredient,
+    Favorite,
+    Ingredient,
+    Recipe,
+    ShoppingCart,
+    Subscription,
+    Tag,
+    User
+)
+from food.importers import catalog_imported
+from food.renditions import renditions_built
+from food.signals import AUTHOR_FIELDS, recipes_added
+
+from .cache import CATALOGS, invalidate_catalog, invalidate_recipe_responses
+from .relations import invalidate_relations
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+def invalidate_catalog_cache(sender, **kwargs):
+    """Сбрасывает кэш каталога после фиксации изменений в базе."""
+    transaction.on_commit(partial(invalidate_catalog, CATALOGS[sender]))
+
+
+@receiver(catalog_imported)
+def invalidate_imported_catalog(sender, **kwargs):
+    """Сбрасывает кэш справочника после импорта командой."""
+    invalidate_catalog(CATALOGS[sender])
+
+
+@receiver(post_save, sender=Favorite)
+@receiver(post_delete, sender=Favorite)
+@receiver(post_save, sender=ShoppingCart)
+@receiver(post_delete, sender=ShoppingCart)
+@receiver(post_save, sender=Subscription)
+@receiver(post_delete, sender=Subscription)
+def invalidate_relations_cache(sender, instance, **kwargs):
+    """Сбрасывает кэш связей пользователя после фиксации изменений."""
+    transaction.on_commit(partial(invalidate_relations, instance.user_id))
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+@receiver(post_save, sender=AmountIngredient)
+@receiver(post_delete, sender=AmountIngredient)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+@receiver(post_delete, sender=User)
+@receiver(recipes_added)
+def invalidate_recipe_responses_cache(sender, created=False, **kwargs):
+    """Сбрасывает кэш ответов с рецептами после фиксации изменений.
+
+    О новых рецептах сообщает recipes_added, поэтому post_save нового
+    рецепта кэш второй раз не сбрасывает.
+    """
+    if created and sender is Recipe:
+        return
+    transaction.on_commit(invalidate_recipe_responses)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, created=False, update_fields=None, **kwargs):
+    """Сбрасывает кэш ответов, если изменились данные автора в рецептах.
+
+    Новый пользователь ещё не автор, а вход меняет только last_login,
+    поэтому регистрация и вход кэш не сбрасывают.
+    """
+    if created or (
+        update_fields is not None
+        and not AUTHOR_FIELDS.intersection(update_fields)
+    ):
+        return
+    transaction.on_commit(invalidate_recipe_responses)
+
+
+@receiver(renditions_built)
+def renditions_changed(sender, **kwargs):
+    """Сбрасывает кэш ответов, когда готовы копии изображений."""
+    invalidate_recipe_responses()
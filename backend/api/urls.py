@@ -16,5 +16,12 @@ router.register('users', views.UserViewSet, basename='users')
 
 urlpatterns = [
     path('', include(router.urls)),
-    path('auth/', include('djoser.urls.authtoken'))
+    path(
+        'auth/token/login/', views.TokenCreateView.as_view(), name='login'
+    ),
+    path(
+        'auth/token/logout/', views.TokenDestroyView.as_view(), name='logout'
+    ),
+    path('auth/', include('djoser.urls.authtoken')),
+    path('db-pool/', views.DatabasePoolView.as_view(), name='db-pool')
 ]
@@ -1,28 +1,51 @@
+import csv
 from datetime import datetime
 
+SHOPPING_CART_CHUNK_SIZE = 500
 
-def get_shopping_cart(shopping_cart):
-    """Возвращает текстовое представление списка покупок."""
-    return '\n'.join([
-        'Время и дата составления списка:',
-        '{:%H:%M %d.%m.%Y}'.format(datetime.now()),
-        'Список продуктов:',
-        *[
-            '{}. {} - {} ({})'.format(
-                index, ingredient.capitalize(), amount, measurement_unit
-            )
-            for index, (ingredient, (amount, measurement_unit)) in enumerate(
-                {
-                    recipe['ingredient_name']: (
-                        sum(
-                            item['amount'] for item in shopping_cart if item[
-                                'ingredient_name'
-                            ] == recipe['ingredient_name']
-                        ), recipe['measurement_unit']
-                    ) for recipe in shopping_cart
-                }.items(), start=1
-            )
-        ],
-        'Для следующих рецептов:',
-        *{recipe['recipe_name'] for recipe in shopping_cart},
-    ])
+
+class Echo:
+    """Псевдобуфер для csv.writer, возвращающий записанную строку."""
+
+    def write(self, value):
+        """Возвращает строку вместо записи в буфер."""
+        return value
+
+
+def shopping_cart_txt(ingredients, recipes):
+    """Построчно формирует текстовый список покупок.
+
+    ``ingredients`` — строки с уже просуммированным количеством каждого
+    продукта, ``recipes`` — названия рецептов из корзины.
+    """
+    yield 'Время и дата составления списка:\n'
+    yield '{:%H:%M %d.%m.%Y}\n'.format(datetime.now())
+    yield 'Список продуктов:\n'
+    for index, ingredient in enumerate(ingredients, start=1):
+        yield '{}. {} - {} ({})\n'.format(
+            index,
+            ingredient['name'].capitalize(),
+            ingredient['amount'],
+            ingredient['measurement_unit']
+        )
+    yield 'Для следующих рецептов:\n'
+    for recipe in recipes:
+        yield f'{recipe}\n'
+
+
+def shopping_cart_csv(ingredients, recipes):
+    """Построчно формирует список покупок в формате CSV."""
+    writer = csv.writer(Echo())
+    yield writer.writerow(('Продукт', 'Количество', 'Единица измерения'))
+    for ingredient in ingredients:
+        yield writer.writerow((
+            ingredient['name'],
+            ingredient['amount'],
+            ingredient['measurement_unit']
+        ))
+
+
+SHOPPING_CART_EXPORTS = {
+    'txt': ('text/plain', shopping_cart_txt),
+    'csv': ('text/csv', shopping_cart_csv),
+}
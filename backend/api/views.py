@@ -1,21 +1,44 @@
-from django.contrib.auth import get_user_model
-from django.db.models import F, Sum
-from django.http import FileResponse
+import hashlib
+import json
+import os
+
+from django.conf import settings
+from django.contrib.auth import get_user_model, user_logged_in
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Count, Max
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django.urls import reverse
 from django_filters.rest_framework import DjangoFilterBackend
+from djoser import views as djoser_views
 from djoser.views import UserViewSet as DjoserUserViewSet
 from rest_framework import status, viewsets, serializers
 from rest_framework.decorators import action
+from rest_framework.parsers import JSONParser, MultiPartParser
 from rest_framework.permissions import (
     AllowAny,
+    IsAdminUser,
     IsAuthenticated,
     IsAuthenticatedOrReadOnly,
+    SAFE_METHODS,
 )
 from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework_simplejwt.tokens import AccessToken
 
+from .authentication import issue_token, revoke_token
+from .autocomplete import get_ingredient_index
+from .cache import (
+    cached_response,
+    catalog_response,
+    conditional_response,
+    request_fingerprint
+)
 from .filters import IngredientFilter, RecipeFilter
+from .paginations import RecipePagination, UserPagination
+from .parsers import ImageUploadParser, NDJSONParser
 from .permissions import IsAuthorOrReadOnly
+from .relations import UserRelations
 from .serializers import (
     ImageSerializer,
     IngredientSerializer,
@@ -25,22 +48,67 @@ from .serializers import (
     SummaryRecipeSerializer,
     TagSerializer,
 )
-from .utils import get_shopping_cart
+from .utils import SHOPPING_CART_CHUNK_SIZE, SHOPPING_CART_EXPORTS
 
+from food.bulk import RecipeImporter, export_recipes
 from food.models import (
+    AmountIngredient,
     Ingredient,
     Recipe,
     Subscription,
     Tag,
 )
+from food.shortlinks import encode, recipe_ids
+from food.storage import release_on_commit
+from foodgram_backend.db.pool import pool_stats
+from foodgram_backend.db.routers import (
+    allow_replica_reads,
+    is_pinned,
+    pin_to_primary,
+    replica_reads
+)
 
 
 User = get_user_model()
 
 
-class UserViewSet(DjoserUserViewSet):
+class ReplicaReadMixin:
+    """Безопасные запросы читают из реплик, если пользователь не писал.
+
+    После успешного изменяющего запроса пользователь на время задержки
+    репликации читает из основной базы.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        """Запрос по умолчанию читает из основной базы."""
+        with replica_reads(False):
+            return super().dispatch(request, *args, **kwargs)
+
+    def initial(self, request, *args, **kwargs):
+        """После аутентификации разрешает чтение из реплик."""
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS and not (
+            request.user.is_authenticated and is_pinned(request.user.pk)
+        ):
+            allow_replica_reads()
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        """Закрепляет за основной базой изменившего данные пользователя."""
+        if (
+            request.method not in SAFE_METHODS
+            and response.status_code < status.HTTP_400_BAD_REQUEST
+            and request.user.is_authenticated
+        ):
+            pin_to_primary(request.user.pk)
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+class UserViewSet(ReplicaReadMixin, DjoserUserViewSet):
     """Пользователи."""
 
+    pagination_class = UserPagination
+    upload_field = 'avatar'
+
     def get_permissions(self):
         """Права доступа."""
         if self.action == 'me':
@@ -51,10 +119,15 @@ class UserViewSet(DjoserUserViewSet):
         ['PUT', 'DELETE'],
         detail=False,
         url_path='me/avatar',
-        permission_classes=[IsAuthenticated]
+        permission_classes=[IsAuthenticated],
+        parser_classes=[JSONParser, MultiPartParser, ImageUploadParser]
     )
     def avatar(self, request):
-        """Аватар."""
+        """Аватар.
+
+        Принимает строку base64 в JSON, файл в multipart-форме или
+        изображение телом запроса.
+        """
         if request.method == 'PUT':
             serializer = ImageSerializer(
                 request.user, data=request.data, partial=True
@@ -68,7 +141,9 @@ class UserViewSet(DjoserUserViewSet):
                     )
                 }
             )
-        request.user.avatar.delete(save=True)
+        release_on_commit(request.user, 'avatar')
+        request.user.avatar = None
+        request.user.save(update_fields=('avatar',))
         return Response(status=status.HTTP_204_NO_CONTENT)
 
     @action(
@@ -80,10 +155,6 @@ class UserViewSet(DjoserUserViewSet):
         """Подписка."""
         user = request.user
         author = get_object_or_404(User, pk=id)
-        serializer = SubscribeSerializer(
-            author,
-            context={'request': request}
-        )
         if request.method == 'DELETE':
             deleted_count, _ = get_object_or_404(
                 Subscription,
@@ -95,10 +166,7 @@ class UserViewSet(DjoserUserViewSet):
                     {'errors': 'Вы не подписаны на этого автора'},
                     status=status.HTTP_400_BAD_REQUEST
                 )
-            return Response(
-                serializer.data,
-                status=status.HTTP_204_NO_CONTENT
-            )
+            return Response(status=status.HTTP_204_NO_CONTENT)
         if user == author:
             return Response(
                 {'errors': 'Нельзя подписаться на самого себя'},
@@ -112,10 +180,26 @@ class UserViewSet(DjoserUserViewSet):
                 {'errors': 'Вы уже подписаны на этого автора'}
             )
         return Response(
-            serializer.data,
+            SubscribeSerializer(
+                User.objects.for_subscriptions(
+                    self.get_recipes_limit()
+                ).get(pk=author.pk),
+                context={'request': request}
+            ).data,
             status=status.HTTP_201_CREATED
         )
 
+    def get_recipes_limit(self):
+        """Ограничение числа рецептов автора из параметра recipes_limit."""
+        recipes_limit = self.request.query_params.get('recipes_limit')
+        if recipes_limit is None:
+            return None
+        if not recipes_limit.isdigit():
+            raise serializers.ValidationError(
+                {'recipes_limit': 'Ожидается неотрицательное целое число'}
+            )
+        return int(recipes_limit)
+
     @action(
         ['GET'],
         detail=False,
@@ -127,7 +211,9 @@ class UserViewSet(DjoserUserViewSet):
         return self.get_paginated_response(
             SubscribeSerializer(
                 self.paginate_queryset(
-                    User.objects.filter(authors__user=request.user)
+                    User.objects.for_subscriptions(
+                        self.get_recipes_limit()
+                    ).filter(authors__user=request.user.pk)
                 ),
                 many=True,
                 context={'request': request}
@@ -135,29 +221,57 @@ class UserViewSet(DjoserUserViewSet):
         )
 
 
-class TagViewSet(viewsets.ReadOnlyModelViewSet):
+class CatalogViewSet(ReplicaReadMixin, viewsets.ReadOnlyModelViewSet):
+    """Справочник, полный список которого отдаётся из кэша."""
+
+    pagination_class = None
+    catalog = None
+
+    def list(self, request, *args, **kwargs):
+        """Список без фильтров берётся из кэша каталога."""
+        if request.query_params:
+            return super().list(request, *args, **kwargs)
+        return catalog_response(
+            request,
+            self.catalog,
+            lambda: self.get_serializer(self.get_queryset(), many=True).data
+        )
+
+
+class TagViewSet(CatalogViewSet):
     """Теги."""
 
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
-    pagination_class = None
+    catalog = 'tags'
 
 
-class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
+class IngredientViewSet(CatalogViewSet):
     """Ингредиенты."""
 
     queryset = Ingredient.objects.all()
     serializer_class = IngredientSerializer
-    pagination_class = None
     filter_backends = (DjangoFilterBackend,)
     filterset_class = IngredientFilter
+    catalog = 'ingredients'
+
+    def list(self, request, *args, **kwargs):
+        """Поиск по названию обслуживается индексом в памяти."""
+        if (
+            settings.INGREDIENT_SEARCH_INDEX
+            and request.query_params.keys() == {'name'}
+        ):
+            return Response(
+                get_ingredient_index().search(request.query_params['name'])
+            )
+        return super().list(request, *args, **kwargs)
 
 
-class RecipeViewSet(viewsets.ModelViewSet):
+class RecipeViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     """Рецепты."""
 
-    queryset = Recipe.objects.all()
     http_method_names = ('get', 'post', 'patch', 'delete')
+    pagination_class = RecipePagination
     permission_classes = (
         IsAuthorOrReadOnly,
         IsAuthenticatedOrReadOnly
@@ -165,6 +279,82 @@ class RecipeViewSet(viewsets.ModelViewSet):
     filter_backends = (DjangoFilterBackend,)
     filterset_class = RecipeFilter
 
+    def get_queryset(self):
+        """Рецепты с подгруженными связями."""
+        return Recipe.objects.for_read()
+
+    def get_validators(self, recipes):
+        """ETag и время изменения ответа с рецептом одним запросом.
+
+        Отметки пользователя не имеют времени изменения, поэтому для
+        авторизованных ETag учитывает их отпечаток, а Last-Modified не
+        отдаётся.
+        """
+        state = recipes.aggregate(
+            updated_at=Max('updated_at'), count=Count('pk')
+        )
+        if not state['count']:
+            return None, None
+        last_modified = state['updated_at']
+        return (
+            self.get_etag(last_modified.isoformat(), str(state['count'])),
+            None if self.request.user.is_authenticated else last_modified
+        )
+
+    def get_etag(self, *parts):
+        """ETag из отпечатка запроса, частей версии и отметок пользователя."""
+        parts = [request_fingerprint(self.request), *parts]
+        if self.request.user.is_authenticated:
+            parts.append(UserRelations.for_request(self.request).digest())
+        return hashlib.sha256('|'.join(parts).encode()).hexdigest()
+
+    def list(self, request, *args, **kwargs):
+        """Список рецептов с условными запросами и кэшем для анонимных.
+
+        ETag строится по уже выбранной странице — id и времени изменения
+        её рецептов и положению страницы — до сериализации и без
+        отдельного запроса. Last-Modified не отдаётся: удаление рецепта
+        или его выход из списка не сдвигают время изменения.
+        """
+        def get_response():
+            page = self.paginate_queryset(
+                self.filter_queryset(self.get_queryset())
+            )
+            etag = self.get_etag(
+                self.paginator.get_page_state(),
+                *(
+                    f'{recipe.pk}:{recipe.updated_at.isoformat()}'
+                    for recipe in page
+                )
+            )
+            return conditional_response(
+                request, etag, None,
+                lambda: self.get_paginated_response(
+                    self.get_serializer(page, many=True).data
+                )
+            )
+
+        return cached_response(request, get_response)
+
+    def retrieve(self, request, *args, **kwargs):
+        """Рецепт с условными запросами и кэшем для анонимных.
+
+        Некорректный id рецепта даёт 404, как ``get_object``.
+        """
+        try:
+            recipe = Recipe.objects.filter(pk=kwargs['pk'])
+        except (TypeError, ValueError, DjangoValidationError):
+            raise Http404
+        return cached_response(
+            request, lambda: conditional_response(
+                request,
+                *self.get_validators(recipe),
+                lambda: super(RecipeViewSet, self).retrieve(
+                    request, *args, **kwargs
+                )
+            )
+        )
+
     def get_serializer_class(self):
         """Вобор сериализатора."""
         if self.action in ('create', 'partial_update'):
@@ -179,15 +369,62 @@ class RecipeViewSet(viewsets.ModelViewSet):
     )
     def short_link(self, request, pk=None):
         """Короткий url."""
-        get_object_or_404(Recipe, pk=pk)
+        if not pk.isdigit() or int(pk) not in recipe_ids:
+            raise Http404
         return Response(
             {
                 'short-link': request.build_absolute_uri(
-                    reverse('food:short-link', args=(pk,))
+                    reverse('food:short-link', args=(encode(int(pk)),))
                 )
             }
         )
 
+    @action(
+        ['GET'],
+        detail=False,
+        permission_classes=[IsAuthenticated]
+    )
+    def export(self, request):
+        """Выгрузка отфильтрованных рецептов в NDJSON.
+
+        Строки совпадают с форматом массового импорта.
+        """
+        response = StreamingHttpResponse(
+            export_recipes(
+                self.filter_queryset(Recipe.objects.all()),
+                settings.RECIPE_BULK_CHUNK_SIZE
+            ),
+            content_type='application/x-ndjson; charset=utf-8'
+        )
+        response['Content-Disposition'] = (
+            'attachment; filename="recipes.ndjson"'
+        )
+        return response
+
+    @action(
+        ['POST'],
+        detail=False,
+        url_path='import',
+        permission_classes=[IsAuthenticated],
+        parser_classes=[NDJSONParser]
+    )
+    def import_recipes(self, request):
+        """Массовый импорт рецептов пользователя из NDJSON.
+
+        Тело читается и обрабатывается блоками, результат каждой строки —
+        id рецепта или ошибки — отдаётся потоком по мере обработки.
+        """
+        results = RecipeImporter(
+            request.user.pk, settings.RECIPE_BULK_CHUNK_SIZE
+        ).run(request.data)
+        return StreamingHttpResponse(
+            (
+                json.dumps(result, ensure_ascii=False) + '\n'
+                for result in results
+            ),
+            content_type='application/x-ndjson; charset=utf-8'
+        )
+
     # def perform_create(self, serializer):
     #     """Создание рецепта."""
     #     serializer.save(author=self.request.user)
@@ -198,25 +435,40 @@ class RecipeViewSet(viewsets.ModelViewSet):
         permission_classes=[IsAuthenticated]
     )
     def download_shopping_cart(self, request):
-        """Скачать список покупок."""
-        if not request.user.shoppingcarts.exists():
-            return serializers.ValidationError(
+        """Скачать список покупок.
+
+        Формат файла задаётся параметром ``file_format``: txt или csv.
+        """
+        file_format = request.query_params.get('file_format', 'txt')
+        if file_format not in SHOPPING_CART_EXPORTS:
+            raise serializers.ValidationError(
+                {'file_format': 'Доступные форматы: {}'.format(
+                    ', '.join(SHOPPING_CART_EXPORTS)
+                )}
+            )
+        recipes = Recipe.objects.filter(
+            shoppingcarts__user=request.user.pk
+        )
+        if not recipes.exists():
+            raise serializers.ValidationError(
                 {'errors': 'Ваша корзина пуста'}
             )
-        return FileResponse(
-            get_shopping_cart(
-                request.user.shoppingcarts.values(
-                    recipe_name=F('recipe__name'),
-                    ingredient_name=F('recipe__ingredients__name'),
-                    measurement_unit=F(
-                        'recipe__ingredients__measurement_unit'
-                    ),
-                ).annotate(
-                    amount=Sum('recipe__amounts__amount')
-                ).order_by('ingredient_name')
-            ), as_attachment=True, filename='shopping_cart.txt',
-            content_type='text/plain'
+        content_type, export = SHOPPING_CART_EXPORTS[file_format]
+        response = StreamingHttpResponse(
+            export(
+                AmountIngredient.objects.shopping_list(
+                    request.user.pk
+                ).iterator(chunk_size=SHOPPING_CART_CHUNK_SIZE),
+                recipes.values_list('name', flat=True).iterator(
+                    chunk_size=SHOPPING_CART_CHUNK_SIZE
+                )
+            ),
+            content_type=f'{content_type}; charset=utf-8'
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="shopping_cart.{file_format}"'
         )
+        return response
 
     @staticmethod
     def add_or_remove_from_collection(request, pk, collection_name):
@@ -269,3 +521,38 @@ class RecipeViewSet(viewsets.ModelViewSet):
             pk,
             'favorites'
         )
+
+
+class DatabasePoolView(APIView):
+    """Состояние пулов соединений с базой процесса для мониторинга."""
+
+    permission_classes = (IsAdminUser,)
+
+    def get(self, request):
+        """Занятые и свободные соединения, ожидания и переподключения."""
+        return Response({'pid': os.getpid(), 'pools': pool_stats()})
+
+
+class TokenCreateView(djoser_views.TokenCreateView):
+    """Вход: подписанный токен, если включён SIGNED_TOKENS."""
+
+    def _action(self, serializer):
+        """Токен без записи в таблицу токенов."""
+        if not settings.SIGNED_TOKENS:
+            return super()._action(serializer)
+        user = serializer.user
+        user_logged_in.send(
+            sender=user.__class__, request=self.request, user=user
+        )
+        return Response({'auth_token': issue_token(user)})
+
+
+class TokenDestroyView(djoser_views.TokenDestroyView):
+    """Выход: подписанный токен отзывается до истечения срока."""
+
+    def post(self, request):
+        """Отзыв токена запроса."""
+        if not isinstance(request.auth, AccessToken):
+            return super().post(request)
+        revoke_token(request.auth)
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -64,8 +64,6 @@ class UserAdmin(BaseUserAdmin):
         """Возвращает queryset с дополнительными полями."""
         queryset = super().get_queryset(request)
         queryset = queryset.annotate(
-            recipes_count=Count('recipes'),
-            subscribers_count=Count('subscribers'),
             favorites_count=Count('favorites'),
         )
         return queryset
@@ -75,16 +73,6 @@ class UserAdmin(BaseUserAdmin):
         """Возвращает количество избранных."""
         return obj.favorites_count
 
-    @admin.display(description='Подписчиков')
-    def subscribers_count(self, obj):
-        """Возвращает количество подписчиков."""
-        return obj.subscribers_count
-
-    @admin.display(description='Количество рецептов')
-    def recipes_count(self, obj):
-        """Возвращает количество рецептов, в которых участвует пользователь."""
-        return obj.recipes_count
-
     @mark_safe
     @admin.display(description='Аватар')
     def avatar_tag(self, user):
@@ -128,11 +116,6 @@ class RecipeAdmin(admin.ModelAdmin):
         """Вывод изображения."""
         return f'<img width="50" height="50" src="{recipe.image.url}" />'
 
-    @admin.display(description='Избранных')
-    def favorites_count(self, recipe):
-        """Вывод количества избранных."""
-        return recipe.favorites.count()
-
     @mark_safe
     @admin.display(description='Продукты')
     def ingredients_list(self, recipe):
@@ -0,0 +1,293 @@
+import json
+import posixpath
+
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.db.models import Q
+from rest_framework import serializers
+
+from .constants import (
+    MAX_AMOUNT,
+    MAX_COOKING_TIME,
+    MAX_MEASUREMENT_UNIT_LENGTH,
+    MAX_NAME_LENGTH,
+    MAX_RECIPE_NAME_LENGTH,
+    MIN_AMOUNT,
+    MIN_COOKING_TIME
+)
+from .importers import chunked
+from .models import AmountIngredient, Ingredient, Recipe, Tag
+from .signals import recipes_created
+from .uploads import decode_base64_upload, prepare_image
+
+IMAGE_DIRECTORY = Recipe._meta.get_field('image').upload_to
+
+
+class ReferenceField(serializers.Field):
+    """Ссылка на объект справочника: id или строковый ключ."""
+
+    def to_internal_value(self, data):
+        """id остаётся числом, ключ — непустой строкой."""
+        if isinstance(data, int) and not isinstance(data, bool):
+            return data
+        if isinstance(data, str) and data.strip():
+            return data.strip()
+        raise serializers.ValidationError('Ожидается id или строка')
+
+
+class BulkAmountSerializer(serializers.Serializer):
+    """Продукт рецепта по id или по названию и единице измерения."""
+
+    id = serializers.IntegerField(required=False)
+    name = serializers.CharField(required=False, max_length=MAX_NAME_LENGTH)
+    measurement_unit = serializers.CharField(
+        required=False, max_length=MAX_MEASUREMENT_UNIT_LENGTH
+    )
+    amount = serializers.IntegerField(
+        min_value=MIN_AMOUNT, max_value=MAX_AMOUNT
+    )
+
+    def validate(self, data):
+        """Нужен id или пара из названия и единицы измерения."""
+        if 'id' in data:
+            data['key'] = data['id']
+        elif 'name' in data and 'measurement_unit' in data:
+            data['key'] = (data['name'], data['measurement_unit'])
+        else:
+            raise serializers.ValidationError(
+                'Укажите id или name и measurement_unit'
+            )
+        return data
+
+
+class BulkRecipeSerializer(serializers.Serializer):
+    """Рецепт из строки NDJSON.
+
+    Проверяет строку без запросов к базе: продукты и тэги всего блока
+    находятся потом одним запросом на справочник.
+    """
+
+    name = serializers.CharField(max_length=MAX_RECIPE_NAME_LENGTH)
+    text = serializers.CharField()
+    cooking_time = serializers.IntegerField(
+        min_value=MIN_COOKING_TIME, max_value=MAX_COOKING_TIME
+    )
+    image = serializers.CharField()
+    tags = serializers.ListField(child=ReferenceField(), allow_empty=False)
+    ingredients = BulkAmountSerializer(many=True, allow_empty=False)
+
+    def validate_image(self, image):
+        """Строка base64 или путь к уже загруженному изображению."""
+        if image.startswith('data:'):
+            return prepare_image(decode_base64_upload(image))
+        if (
+            posixpath.normpath(image) != image
+            or not image.startswith(IMAGE_DIRECTORY)
+            or not default_storage.exists(image)
+        ):
+            raise serializers.ValidationError('Изображение не найдено')
+        return image
+
+    def validate(self, data):
+        """Продукты и тэги рецепта не повторяются."""
+        keys = [ingredient['key'] for ingredient in data['ingredients']]
+        if len(keys) != len(set(keys)):
+            raise serializers.ValidationError(
+                {'ingredients': 'Ингредиенты должны быть уникальны'}
+            )
+        if len(data['tags']) != len(set(data['tags'])):
+            raise serializers.ValidationError(
+                {'tags': 'Тэги должны быть уникальны'}
+            )
+        return data
+
+
+def find_ingredients(keys):
+    """Продукты по id и парам (название, единица) одним запросом."""
+    ids = {key for key in keys if isinstance(key, int)}
+    names = {key[0] for key in keys if isinstance(key, tuple)}
+    found = {}
+    for ingredient in Ingredient.objects.filter(
+        Q(pk__in=ids) | Q(name__in=names)
+    ):
+        found[ingredient.pk] = ingredient
+        found[(ingredient.name, ingredient.measurement_unit)] = ingredient
+    return found
+
+
+def find_tags(keys):
+    """Тэги по id и slug одним запросом."""
+    found = {}
+    for tag in Tag.objects.filter(
+        Q(pk__in=[key for key in keys if isinstance(key, int)])
+        | Q(slug__in=[key for key in keys if isinstance(key, str)])
+    ):
+        found[tag.pk] = found[tag.slug] = tag
+    return found
+
+
+def missing(keys, found):
+    """Ошибка со ссылками, которых нет в справочнике."""
+    absent = [key for key in keys if key not in found]
+    if absent:
+        return 'Не найдены: {}'.format(', '.join(
+            ' '.join(key) if isinstance(key, tuple) else str(key)
+            for key in absent
+        ))
+    return None
+
+
+class RecipeImporter:
+    """Добавляет рецепты автора из строк NDJSON блоками.
+
+    Строки блока проверяются по отдельности, продукты и тэги находятся
+    одним запросом на блок, а рецепты, количества продуктов и тэги
+    добавляются через bulk_create в одной транзакции на блок. Для каждой
+    строки отдаётся результат: id нового рецепта или ошибки.
+    """
+
+    def __init__(self, author_id, chunk_size):
+        self.author_id = author_id
+        self.chunk_size = chunk_size
+
+    def run(self, lines):
+        """Результаты по строкам в порядке их чтения."""
+        numbered = (
+            (number, line) for number, line in enumerate(lines, start=1)
+            if line.strip()
+        )
+        for chunk in chunked(numbered, self.chunk_size):
+            yield from self.import_chunk(chunk)
+
+    def parse(self, line):
+        """Проверенные данные строки или ошибки."""
+        try:
+            data = json.loads(line)
+        except ValueError:
+            return None, {'non_field_errors': ['Неверный JSON']}
+        if not isinstance(data, dict):
+            return None, {'non_field_errors': ['Ожидается объект JSON']}
+        serializer = BulkRecipeSerializer(data=data)
+        if not serializer.is_valid():
+            return None, serializer.errors
+        return serializer.validated_data, None
+
+    def resolve(self, data, ingredients, tags):
+        """Находит продукты и тэги рецепта среди найденных для блока."""
+        errors = {}
+        keys = [ingredient['key'] for ingredient in data['ingredients']]
+        for field, field_keys, found in (
+            ('ingredients', keys, ingredients),
+            ('tags', data['tags'], tags),
+        ):
+            error = missing(field_keys, found)
+            if error:
+                errors[field] = [error]
+        if not errors:
+            resolved = [ingredients[key].pk for key in keys]
+            if len(resolved) != len(set(resolved)):
+                errors['ingredients'] = ['Ингредиенты должны быть уникальны']
+            elif len({tags[key].pk for key in data['tags']}) != len(
+                data['tags']
+            ):
+                errors['tags'] = ['Тэги должны быть уникальны']
+        return errors
+
+    def import_chunk(self, chunk):
+        """Проверяет и добавляет блок строк."""
+        results = {}
+        valid = []
+        for number, line in chunk:
+            data, errors = self.parse(line)
+            if errors:
+                results[number] = {'line': number, 'errors': errors}
+            else:
+                valid.append((number, data))
+        ingredients = find_ingredients({
+            ingredient['key']
+            for _, data in valid for ingredient in data['ingredients']
+        })
+        tags = find_tags({tag for _, data in valid for tag in data['tags']})
+        records = []
+        for number, data in valid:
+            errors = self.resolve(data, ingredients, tags)
+            if errors:
+                results[number] = {'line': number, 'errors': errors}
+            else:
+                records.append((number, data))
+        if records:
+            for (number, _), recipe in zip(
+                records, self.write(records, ingredients, tags)
+            ):
+                results[number] = {'line': number, 'id': recipe.pk}
+        for number, _ in chunk:
+            yield results[number]
+
+    @transaction.atomic
+    def write(self, records, ingredients, tags):
+        """Добавляет рецепты блока и их связи, возвращает рецепты."""
+        recipes = Recipe.objects.bulk_create(
+            Recipe(
+                author_id=self.author_id,
+                name=data['name'],
+                text=data['text'],
+                cooking_time=data['cooking_time'],
+                image=data['image']
+            ) for _, data in records
+        )
+        if not connection.features.can_return_rows_from_bulk_insert:
+            # Транзакция держит блокировку записи, поэтому последние id
+            # автора принадлежат только что добавленным рецептам.
+            ids = Recipe.objects.filter(
+                author_id=self.author_id
+            ).order_by('-pk').values_list('pk', flat=True)[:len(recipes)]
+            for recipe, pk in zip(recipes, list(ids)[::-1]):
+                recipe.pk = pk
+        AmountIngredient.objects.bulk_create(
+            AmountIngredient(
+                recipe=recipe,
+                ingredient=ingredients[ingredient['key']],
+                amount=ingredient['amount']
+            )
+            for recipe, (_, data) in zip(recipes, records)
+            for ingredient in data['ingredients']
+        )
+        RecipeTag = Recipe.tags.through
+        RecipeTag.objects.bulk_create(
+            RecipeTag(recipe=recipe, tag=tags[key])
+            for recipe, (_, data) in zip(recipes, records)
+            for key in data['tags']
+        )
+        recipes_created(recipes)
+        return recipes
+
+
+def export_recipes(recipes, chunk_size):
+    """Строки NDJSON с рецептами в формате импорта.
+
+    Рецепты читаются блоками по id, связи каждого блока подгружаются
+    двумя запросами, поэтому память не растёт с размером выгрузки.
+    """
+    ids = recipes.order_by('pk').values_list('pk', flat=True)
+    for chunk in chunked(ids.iterator(chunk_size=chunk_size), chunk_size):
+        for recipe in Recipe.objects.filter(pk__in=chunk).order_by(
+            'pk'
+        ).prefetch_related('tags', 'amounts__ingredient'):
+            yield json.dumps({
+                'id': recipe.pk,
+                'name': recipe.name,
+                'text': recipe.text,
+                'cooking_time': recipe.cooking_time,
+                'image': recipe.image.name,
+                'tags': [tag.slug for tag in recipe.tags.all()],
+                'ingredients': [
+                    {
+                        'name': amount.ingredient.name,
+                        'measurement_unit': (
+                            amount.ingredient.measurement_unit
+                        ),
+                        'amount': amount.amount,
+                    }
+                    for amount in recipe.amounts.all()
+                ],
+            }, ensure_ascii=False) + '\n'
@@ -8,3 +8,15 @@ MAX_AMOUNT = 64000
 MIN_COOKING_TIME = 1
 MAX_COOKING_TIME = 1440
 MAX_MEASUREMENT_UNIT_LENGTH = 64
+SEARCH_CONFIG = 'russian'
+# Наибольшая сторона уменьшенных копий изображений в пикселях.
+IMAGE_RENDITIONS = {'thumbnail': 320, 'card': 640, 'full': 1280}
+AVATAR_RENDITIONS = {'thumbnail': 160}
+RENDITION_QUALITY = 80
+# Короткие ссылки: алфавит base62, длина кода и множитель, которым id
+# рецепта перемешивается по модулю 62 ** SHORT_CODE_LENGTH.
+SHORT_CODE_ALPHABET = (
+    '0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ'
+)
+SHORT_CODE_LENGTH = 7
+SHORT_CODE_MULTIPLIER = 1580030173
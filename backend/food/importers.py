@@ -0,0 +1,157 @@
+import csv
+import io
+import json
+from itertools import islice
+
+from django.db import connection, transaction
+from django.dispatch import Signal
+
+# Размер блока при чтении массива JSON.
+JSON_READ_SIZE = 64 * 1024
+FORMATS = ('csv', 'json', 'ndjson')
+
+# Отправляется после импорта справочника: sender — модель справочника.
+catalog_imported = Signal()
+
+
+def chunked(iterable, size):
+    """Списки из не более чем size элементов подряд."""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def read_csv(file, fields):
+    """Записи CSV без заголовка или с заголовком из имён полей."""
+    for number, row in enumerate(csv.reader(file)):
+        values = [value.strip() for value in row]
+        if number == 0 and values == list(fields):
+            continue
+        yield dict(zip(fields, values))
+
+
+def read_ndjson(file):
+    """Объекты JSON, по одному в строке."""
+    for line in file:
+        if line.strip():
+            yield json.loads(line)
+
+
+def read_json_array(file):
+    """Элементы массива JSON по одному, без чтения файла целиком."""
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    started = False
+    while True:
+        chunk = file.read(JSON_READ_SIZE)
+        buffer = buffer[position:] + chunk
+        position = 0
+        while True:
+            while position < len(buffer) and (
+                buffer[position].isspace() or buffer[position] == ','
+            ):
+                position += 1
+            if position == len(buffer):
+                break
+            if not started:
+                if buffer[position] != '[':
+                    raise ValueError('Ожидался массив JSON')
+                started = True
+                position += 1
+                continue
+            if buffer[position] == ']':
+                return
+            try:
+                item, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if not chunk:
+                    raise
+                break
+            yield item
+        if not chunk:
+            raise ValueError('Массив JSON не закрыт')
+
+
+def read_records(file, file_format, fields):
+    """Записи файла в формате csv, json или ndjson."""
+    if file_format == 'csv':
+        return read_csv(file, fields)
+    if file_format == 'ndjson':
+        return read_ndjson(file)
+    return read_json_array(file)
+
+
+class CatalogImporter:
+    """Добавляет записи справочника блоками, пропуская существующие.
+
+    В PostgreSQL блок копируется командой COPY во временную таблицу и
+    переносится в справочник одним INSERT ... ON CONFLICT DO NOTHING, в
+    других базах добавляется через bulk_create.
+    """
+
+    def __init__(self, model, fields):
+        self.model = model
+        self.fields = fields
+        self.columns = [model._meta.get_field(name).column for name in fields]
+        self.staging = f'{model._meta.db_table}_import'
+        self.staged = False
+
+    def clean(self, record):
+        """Значения полей записи или None для некорректной записи."""
+        values = []
+        for name in self.fields:
+            value = record.get(name)
+            if not isinstance(value, str):
+                return None
+            value = value.strip()
+            if not value or len(value) > (
+                self.model._meta.get_field(name).max_length
+            ):
+                return None
+            values.append(value)
+        return values
+
+    def write(self, rows):
+        """Добавляет блок строк и возвращает число добавленных."""
+        if connection.vendor == 'postgresql':
+            return self.copy(rows)
+        with transaction.atomic():
+            count = self.model.objects.count()
+            self.model.objects.bulk_create(
+                (self.model(**dict(zip(self.fields, row))) for row in rows),
+                batch_size=len(rows),
+                ignore_conflicts=True
+            )
+            return self.model.objects.count() - count
+
+    def copy(self, rows):
+        """COPY блока во временную таблицу и перенос в справочник."""
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        buffer.seek(0)
+        columns = ', '.join(self.columns)
+        table = self.model._meta.db_table
+        with transaction.atomic(), connection.cursor() as cursor:
+            if not self.staged:
+                cursor.execute(
+                    f'CREATE TEMP TABLE IF NOT EXISTS {self.staging} AS '
+                    f'SELECT {columns} FROM {table} WITH NO DATA'
+                )
+                self.staged = True
+            cursor.copy_expert(
+                f'COPY {self.staging} ({columns}) FROM STDIN '
+                'WITH (FORMAT csv)',
+                buffer
+            )
+            cursor.execute(
+                f'INSERT INTO {table} ({columns}) '
+                f'SELECT DISTINCT {columns} FROM {self.staging} '
+                'ON CONFLICT DO NOTHING'
+            )
+            inserted = cursor.rowcount
+            cursor.execute(f'TRUNCATE {self.staging}')
+        return inserted
@@ -0,0 +1,116 @@
+import re
+from types import SimpleNamespace
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+
+from api.filters import RecipeFilter
+from food.models import AmountIngredient, Ingredient, Recipe, Tag
+
+User = get_user_model()
+
+PAGE_SIZE = 10
+# PostgreSQL: «Seq Scan on table», SQLite: «SCAN table» без «USING INDEX».
+SEQ_SCAN_PATTERNS = {
+    'postgresql': re.compile(r'Seq Scan on (\w+)'),
+    'sqlite': re.compile(r'\bSCAN (?:TABLE )?(\w+)\b(?! USING)'),
+}
+
+
+class Command(BaseCommand):
+    """
+    Команда для проверки планов выполнения частых запросов API.
+    python manage.py explain_queries --fail-on-seq-scan.
+    """
+    help = 'Выполняет EXPLAIN для частых запросов и сообщает о полных сканах'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user', type=int,
+            help='id пользователя, от имени которого строятся запросы'
+        )
+        parser.add_argument(
+            '--analyze', action='store_true',
+            help='EXPLAIN ANALYZE (только PostgreSQL)'
+        )
+        parser.add_argument(
+            '--verbose-plans', action='store_true',
+            help='Печатать планы целиком'
+        )
+        parser.add_argument(
+            '--fail-on-seq-scan', action='store_true',
+            help='Завершиться с ошибкой, если найден полный скан таблицы'
+        )
+
+    def get_user(self, user_id):
+        """Пользователь из параметра или самый активный подписчик."""
+        if user_id is not None:
+            try:
+                return User.objects.get(pk=user_id)
+            except User.DoesNotExist:
+                raise CommandError(f'Пользователь {user_id} не найден')
+        user = User.objects.annotate(
+            subscriptions_count=Count('subscribers')
+        ).order_by('-subscriptions_count').first()
+        if user is None:
+            raise CommandError('В базе нет пользователей')
+        return user
+
+    def get_queries(self, user):
+        """Запросы в том виде, в котором их строит API."""
+        request = SimpleNamespace(user=user)
+        recipes = Recipe.objects.for_read()
+        author = Recipe.objects.values_list('author', flat=True).first()
+        tags = list(Tag.objects.values_list('slug', flat=True)[:2])
+
+        def filtered(**data):
+            return RecipeFilter(
+                data, queryset=recipes, request=request
+            ).qs[:PAGE_SIZE]
+
+        return {
+            'recipes_feed': recipes[:PAGE_SIZE],
+            'recipes_by_tags': filtered(tags=tags),
+            'recipes_by_author': filtered(author=author),
+            'recipes_favorited': filtered(is_favorited=True),
+            'recipes_in_shopping_cart': filtered(is_in_shopping_cart=True),
+            'recipes_search': filtered(search='суп'),
+            'subscriptions': User.objects.for_subscriptions(3).filter(
+                authors__user=user
+            )[:PAGE_SIZE],
+            'author_recipes_preview': Recipe.objects.filter(
+                author=author
+            )[:3],
+            'shopping_list': AmountIngredient.objects.shopping_list(user),
+            'ingredients_by_prefix': Ingredient.objects.filter(
+                name__istartswith='сах'
+            ),
+        }
+
+    def handle(self, *args, **options):
+        pattern = SEQ_SCAN_PATTERNS.get(connection.vendor)
+        if pattern is None:
+            raise CommandError(
+                f'База {connection.vendor} не поддерживается'
+            )
+        explain_options = {}
+        if options['analyze'] and connection.vendor == 'postgresql':
+            explain_options['analyze'] = True
+        user = self.get_user(options['user'])
+        found = False
+        for name, queryset in self.get_queries(user).items():
+            plan = queryset.explain(**explain_options)
+            tables = sorted(set(pattern.findall(plan)))
+            if tables:
+                found = True
+                self.stdout.write(self.style.WARNING(
+                    f'{name}: полный скан {", ".join(tables)}'
+                ))
+            else:
+                self.stdout.write(self.style.SUCCESS(f'{name}: OK'))
+            if options['verbose_plans']:
+                self.stdout.write(plan)
+        if found and options['fail_on_seq_scan']:
+            raise CommandError('Найдены полные сканы таблиц')
@@ -0,0 +1,51 @@
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from food.bulk import export_recipes
+from food.models import Recipe
+
+
+class Command(BaseCommand):
+    """
+    Команда для выгрузки рецептов в NDJSON в формате импорта.
+    python manage.py export_recipes recipes.ndjson.
+    """
+    help = 'Выгружает рецепты в NDJSON блоками'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Путь к файлу или - для stdout')
+        parser.add_argument(
+            '--author', help='Выгрузить рецепты только этого автора (email)'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int,
+            default=settings.RECIPE_BULK_CHUNK_SIZE,
+            help='Число рецептов, читаемых за раз'
+        )
+
+    def handle(self, *args, **options):
+        recipes = Recipe.objects.all()
+        if options['author']:
+            recipes = recipes.filter(author__email=options['author'])
+        path = options['path']
+        if path == '-':
+            file = sys.stdout
+        else:
+            try:
+                file = open(path, 'w', encoding='utf-8')
+            except OSError as error:
+                raise CommandError(f'Не удалось открыть {path}: {error}')
+        count = 0
+        try:
+            for line in export_recipes(recipes, options['chunk_size']):
+                file.write(line)
+                count += 1
+        finally:
+            if file is not sys.stdout:
+                file.close()
+        if file is not sys.stdout:
+            self.stdout.write(self.style.SUCCESS(
+                f'Рецепты: выгружено {count} в {path}'
+            ))
@@ -0,0 +1,123 @@
+import posixpath
+from datetime import timedelta
+from functools import reduce
+from itertools import islice
+from operator import or_
+
+from django.apps import apps
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+
+from food.renditions import rendition_source
+from food.storage import MEDIA_FIELDS
+
+
+def walk(path):
+    """Имена всех файлов каталога хранилища, включая вложенные."""
+    if not default_storage.exists(path):
+        return
+    directories, files = default_storage.listdir(path)
+    for name in files:
+        yield posixpath.join(path, name)
+    for directory in directories:
+        yield from walk(posixpath.join(path, directory))
+
+
+def rendition_paths(renditions):
+    """Пути копий из значения поля копий."""
+    return {
+        path for rendition, path in renditions.items()
+        if rendition != 'source'
+    }
+
+
+class Command(BaseCommand):
+    """
+    Команда для удаления медиафайлов, на которые не ссылаются объекты.
+    python manage.py gc_media --dry-run.
+    """
+    help = 'Удаляет изображения и их копии, не используемые в базе'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Число файлов, проверяемых одним запросом'
+        )
+        parser.add_argument(
+            '--min-age', type=int, default=3600,
+            help='Не трогать файлы моложе стольких секунд'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только показать, какие файлы будут удалены'
+        )
+
+    def handle(self, *args, **options):
+        fields = [
+            (apps.get_model(model), field, renditions_field)
+            for model, field, renditions_field in MEDIA_FIELDS
+        ]
+        cutoff = timezone.now() - timedelta(seconds=options['min_age'])
+        checked = removed = 0
+        for model, field, _ in fields:
+            files = walk(model._meta.get_field(field).upload_to.rstrip('/'))
+            while True:
+                batch = list(islice(files, options['batch_size']))
+                if not batch:
+                    break
+                checked += len(batch)
+                referenced = self.referenced(fields, batch)
+                for name in batch:
+                    if (
+                        name in referenced
+                        or default_storage.get_modified_time(name) > cutoff
+                    ):
+                        continue
+                    removed += 1
+                    if options['dry_run']:
+                        self.stdout.write(name)
+                    else:
+                        default_storage.delete(name)
+        self.stdout.write(self.style.SUCCESS(
+            '{}: проверено {}, {} {}'.format(
+                'Пробный запуск' if options['dry_run'] else 'Готово',
+                checked,
+                'к удалению' if options['dry_run'] else 'удалено',
+                removed
+            )
+        ))
+
+    def referenced(self, fields, batch):
+        """Файлы блока, на которые ссылаются объекты.
+
+        Копия используется, если используется её исходный файл, поэтому
+        исходники копий проверяются тем же запросом ``__in``, что и
+        исходные файлы. Копии со старыми именами, по которым исходник не
+        восстановить, ищутся в полях копий отдельным запросом на блок.
+        """
+        sources = {}
+        legacy = []
+        for name in batch:
+            source = rendition_source(name)
+            if source is not None:
+                sources[name] = source
+            elif 'renditions' in name.split('/')[:-1]:
+                legacy.append(name)
+        names = set(batch) | set(sources.values())
+        used = set()
+        for model, field, renditions_field in fields:
+            used.update(model.objects.filter(
+                **{f'{field}__in': names}
+            ).values_list(field, flat=True))
+            if legacy:
+                for renditions in model.objects.filter(reduce(or_, (
+                    Q(**{f'{renditions_field}__icontains': name})
+                    for name in legacy
+                ))).values_list(renditions_field, flat=True):
+                    used.update(rendition_paths(renditions))
+        return {
+            name for name in batch
+            if name in used or sources.get(name) in used
+        }
@@ -0,0 +1,103 @@
+import os
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from food.importers import (
+    FORMATS,
+    CatalogImporter,
+    catalog_imported,
+    chunked,
+    read_records
+)
+from food.models import Ingredient, Tag
+
+# Справочники: модель и поля записи в порядке столбцов CSV.
+CATALOG_FIELDS = {
+    'ingredients': (Ingredient, ('name', 'measurement_unit')),
+    'tags': (Tag, ('name', 'slug')),
+}
+
+
+class Command(BaseCommand):
+    """
+    Команда для потокового импорта продуктов и тэгов.
+    python manage.py import_catalog ingredients data/ingredients.csv.
+    """
+    help = 'Импортирует справочник из CSV, JSON или NDJSON блоками'
+
+    def add_arguments(self, parser):
+        parser.add_argument('catalog', choices=sorted(CATALOG_FIELDS))
+        parser.add_argument('path', help='Путь к файлу или - для stdin')
+        parser.add_argument(
+            '--format', choices=FORMATS,
+            help='Формат файла, по умолчанию — по расширению'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=5000,
+            help='Число записей, добавляемых за раз'
+        )
+
+    def get_format(self, path, file_format):
+        """Формат из параметра или расширения файла."""
+        file_format = file_format or os.path.splitext(path)[1][1:].lower()
+        if file_format not in FORMATS:
+            raise CommandError(
+                f'Не удалось определить формат {path}, укажите --format'
+            )
+        return file_format
+
+    def handle(self, *args, **options):
+        model, fields = CATALOG_FIELDS[options['catalog']]
+        path = options['path']
+        file_format = self.get_format(path, options['format'])
+        if path == '-':
+            file, size = sys.stdin, None
+        else:
+            try:
+                file = open(path, encoding='utf-8', newline='')
+            except OSError as error:
+                raise CommandError(f'Не удалось открыть {path}: {error}')
+            size = os.fstat(file.fileno()).st_size
+        importer = CatalogImporter(model, fields)
+        started = time.monotonic()
+        read = skipped = inserted = 0
+        try:
+            for records in chunked(
+                read_records(file, file_format, fields),
+                options['chunk_size']
+            ):
+                rows = []
+                for record in records:
+                    row = importer.clean(record)
+                    if row is None:
+                        skipped += 1
+                    else:
+                        rows.append(row)
+                read += len(records)
+                if rows:
+                    inserted += importer.write(rows)
+                self.report(read, started, file, size)
+        except ValueError as error:
+            raise CommandError(f'{path}: ошибка после записи {read}: {error}')
+        finally:
+            if file is not sys.stdin:
+                file.close()
+        catalog_imported.send(sender=model)
+        self.stdout.write(self.style.SUCCESS(
+            f'{model._meta.verbose_name_plural}: прочитано {read}, '
+            f'добавлено {inserted}, '
+            f'пропущено некорректных {skipped} '
+            f'за {time.monotonic() - started:.1f} с'
+        ))
+
+    def report(self, read, started, file, size):
+        """Печатает число записей, скорость и долю прочитанного файла."""
+        elapsed = max(time.monotonic() - started, 1e-6)
+        progress = ''
+        if size:
+            progress = f', {min(file.buffer.tell() / size, 1):.0%}'
+        self.stdout.write(
+            f'{read} записей, {read / elapsed:.0f} записей/с{progress}'
+        )
@@ -1,11 +1,12 @@
-# flake8: noqa
+from django.core.management import call_command
 from django.core.management.base import BaseCommand
 
-from food.models import Ingredient
-from .import_json import import_data_from_json
-
 
 class Command(BaseCommand):
+    help = 'Импортирует продукты из data/ingredients.json'
+
     def handle(self, *args, **options):
-        import_data_from_json('data/ingredients.json', Ingredient)
-        self.stdout.write(self.style.SUCCESS('Импорт продуктов завершён.'))
+        call_command(
+            'import_catalog', 'ingredients', 'data/ingredients.json',
+            stdout=self.stdout
+        )
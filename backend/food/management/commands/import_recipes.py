@@ -0,0 +1,62 @@
+import json
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+
+from food.bulk import RecipeImporter
+from food.models import User
+
+
+class Command(BaseCommand):
+    """
+    Команда для массового импорта рецептов автора из NDJSON.
+    python manage.py import_recipes recipes.ndjson --author admin@foodgram.ru.
+    """
+    help = 'Импортирует рецепты из NDJSON блоками от имени автора'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Путь к файлу или - для stdin')
+        parser.add_argument(
+            '--author', required=True, help='Email или имя пользователя'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int,
+            default=settings.RECIPE_BULK_CHUNK_SIZE,
+            help='Число рецептов, добавляемых за раз'
+        )
+
+    def handle(self, *args, **options):
+        author = User.objects.filter(
+            Q(email=options['author']) | Q(username=options['author'])
+        ).first()
+        if author is None:
+            raise CommandError(f'Автор {options["author"]} не найден')
+        path = options['path']
+        if path == '-':
+            file = sys.stdin
+        else:
+            try:
+                file = open(path, encoding='utf-8')
+            except OSError as error:
+                raise CommandError(f'Не удалось открыть {path}: {error}')
+        started = time.monotonic()
+        inserted = failed = 0
+        try:
+            for result in RecipeImporter(
+                author.pk, options['chunk_size']
+            ).run(file):
+                if 'errors' in result:
+                    failed += 1
+                    self.stderr.write(json.dumps(result, ensure_ascii=False))
+                else:
+                    inserted += 1
+        finally:
+            if file is not sys.stdin:
+                file.close()
+        self.stdout.write(self.style.SUCCESS(
+            f'Рецепты: добавлено {inserted}, с ошибками {failed} '
+            f'за {time.monotonic() - started:.1f} с'
+        ))
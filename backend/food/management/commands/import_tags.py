@@ -1,11 +1,11 @@
-# flake8: noqa
+from django.core.management import call_command
 from django.core.management.base import BaseCommand
 
-from food.models import Tag
-from .import_json import import_data_from_json
-
 
 class Command(BaseCommand):
+    help = 'Импортирует тэги из data/tags.json'
+
     def handle(self, *args, **options):
-        import_data_from_json('data/tags.json', Tag)
-        self.stdout.write(self.style.SUCCESS('Импорт тэгов завершён.'))
+        call_command(
+            'import_catalog', 'tags', 'data/tags.json', stdout=self.stdout
+        )
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from food.models import Favorite, Recipe, Subscription, User
+
+
+def count_of(model, field):
+    """Число строк model, ссылающихся через field на внешнюю строку."""
+    return Coalesce(
+        Subquery(
+            model.objects.filter(
+                **{field: OuterRef('pk')}
+            ).order_by().values(field).annotate(
+                count=Count('pk')
+            ).values('count')
+        ),
+        0
+    )
+
+
+COUNTERS = (
+    (Recipe, 'favorites_count', Favorite, 'recipe'),
+    (User, 'recipes_count', Recipe, 'author'),
+    (User, 'subscribers_count', Subscription, 'author'),
+)
+
+
+class Command(BaseCommand):
+    """
+    Команда для пересчёта счётчиков избранного, рецептов и подписчиков.
+    python manage.py recount.
+    """
+    help = 'Исправляет расхождения денормализованных счётчиков'
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        for model, field, related_model, related_field in COUNTERS:
+            actual = count_of(related_model, related_field)
+            repaired = model.objects.exclude(
+                **{field: actual}
+            ).update(**{field: actual})
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f'{model.__name__}.{field}: исправлено {repaired}'
+                )
+            )
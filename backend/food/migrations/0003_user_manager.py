@@ -0,0 +1,20 @@
+# Generated by Django 3.2.3 on 2026-10-18 05:49
+
+from django.db import migrations
+import food.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('food', '0002_auto_20250223_1553'),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name='user',
+            managers=[
+                ('objects', food.models.UserManager()),
+            ],
+        ),
+    ]
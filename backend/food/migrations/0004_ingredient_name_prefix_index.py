@@ -0,0 +1,35 @@
+from django.db import migrations
+
+INDEX_NAME = 'food_ingredient_name_upper_like'
+
+
+def create_prefix_index(apps, schema_editor):
+    """Индекс для name__istartswith, только для PostgreSQL.
+
+    Django 3.2 не позволяет задать класс операторов для индекса по
+    выражению, а без text_pattern_ops PostgreSQL не использует индекс
+    для LIKE при локали, отличной от C.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        f'CREATE INDEX IF NOT EXISTS {INDEX_NAME} '
+        'ON food_ingredient (UPPER(name::text) text_pattern_ops)'
+    )
+
+
+def drop_prefix_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f'DROP INDEX IF EXISTS {INDEX_NAME}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('food', '0003_user_manager'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_prefix_index, drop_prefix_index),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 3.2.3 on 2026-10-18 05:53
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+INDEX_NAME = 'food_recipe_search_vector_gin'
+
+
+def create_search_index(apps, schema_editor):
+    """GIN-индекс и заполнение поискового вектора, только для PostgreSQL."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        f'CREATE INDEX IF NOT EXISTS {INDEX_NAME} '
+        'ON food_recipe USING gin (search_vector)'
+    )
+    schema_editor.execute(
+        "UPDATE food_recipe SET search_vector = "
+        "setweight(to_tsvector('russian', name), 'A') "
+        "|| setweight(to_tsvector('russian', coalesce(("
+        "SELECT string_agg(food_ingredient.name, ' ') "
+        "FROM food_amountingredient JOIN food_ingredient "
+        "ON food_ingredient.id = food_amountingredient.ingredient_id "
+        "WHERE food_amountingredient.recipe_id = food_recipe.id"
+        "), '')), 'B') "
+        "|| setweight(to_tsvector('russian', text), 'C')"
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f'DROP INDEX IF EXISTS {INDEX_NAME}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('food', '0004_ingredient_name_prefix_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True, verbose_name='Поисковый вектор'),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
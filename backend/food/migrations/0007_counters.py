@@ -0,0 +1,57 @@
+# Generated by Django 3.2.3 on 2026-10-18 05:57
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_of(model, field):
+    """Число строк model, ссылающихся через field на внешнюю строку."""
+    return Coalesce(
+        Subquery(
+            model.objects.filter(
+                **{field: OuterRef('pk')}
+            ).order_by().values(field).annotate(
+                count=Count('pk')
+            ).values('count')
+        ),
+        0
+    )
+
+
+def fill_counters(apps, schema_editor):
+    Recipe = apps.get_model('food', 'Recipe')
+    User = apps.get_model('food', 'User')
+    Favorite = apps.get_model('food', 'Favorite')
+    Subscription = apps.get_model('food', 'Subscription')
+    Recipe.objects.update(favorites_count=count_of(Favorite, 'recipe'))
+    User.objects.update(
+        recipes_count=count_of(Recipe, 'author'),
+        subscribers_count=count_of(Subscription, 'author')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('food', '0006_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='favorites_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='В избранном'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='recipes_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Рецептов'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='subscribers_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Подписчиков'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 3.2.3 on 2026-10-18 06:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('food', '0007_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='image_renditions',
+            field=models.JSONField(default=dict, editable=False, verbose_name='Копии изображения'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='avatar_renditions',
+            field=models.JSONField(default=dict, editable=False, verbose_name='Копии аватара'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 3.2.3 on 2026-10-18 06:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('food', '0008_renditions'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='recipe',
+            name='image',
+            field=models.ImageField(db_index=True, upload_to='food/images/', verbose_name='Изображение'),
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='avatar',
+            field=models.ImageField(db_index=True, default=None, null=True, upload_to='users/', verbose_name='Аватар'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+from django.db import migrations, models
+from django.db.models import F
+import django.utils.timezone
+
+
+def fill_updated_at(apps, schema_editor):
+    """Время изменения существующих рецептов — время их публикации."""
+    apps.get_model('food', 'Recipe').objects.update(updated_at=F('pub_date'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('food', '0009_media_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, default=django.utils.timezone.now, verbose_name='Время изменения'),
+            preserve_default=False,
+        ),
+        migrations.RunPython(fill_updated_at, migrations.RunPython.noop),
+    ]
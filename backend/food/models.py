@@ -1,5 +1,14 @@
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.contrib.auth.models import UserManager as BaseUserManager
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    SearchVectorField
+)
+from django.db import connections, models
+from django.db.models.functions import Coalesce
 from django.contrib.auth.validators import UnicodeUsernameValidator
 from django.core import validators
 
@@ -13,10 +22,41 @@ from .constants import (
     MAX_USERNAME_LENGTH,
     MIN_AMOUNT,
     MIN_COOKING_TIME,
-    MAX_COOKING_TIME
+    MAX_COOKING_TIME,
+    SEARCH_CONFIG
 )
 
 
+class UserQuerySet(models.QuerySet):
+    """Набор запросов пользователей."""
+
+    def for_subscriptions(self, recipes_limit=None):
+        """Авторы с их рецептами для списка подписок.
+
+        Рецепты подгружаются одним запросом для всех авторов страницы,
+        ``recipes_limit`` ограничивает их число у каждого автора прямо в
+        базе.
+        """
+        recipes = Recipe.objects.all()
+        if recipes_limit is not None:
+            recipes = recipes.filter(
+                pk__in=models.Subquery(
+                    Recipe.objects.filter(
+                        author=models.OuterRef('author')
+                    ).values('pk')[:recipes_limit]
+                )
+            )
+        return self.prefetch_related(
+            models.Prefetch(
+                'recipes', queryset=recipes, to_attr='preview_recipes'
+            )
+        )
+
+
+class UserManager(BaseUserManager.from_queryset(UserQuerySet)):
+    """Менеджер пользователей."""
+
+
 class User(AbstractUser):
     """Модель пользователя."""
 
@@ -34,11 +74,22 @@ class User(AbstractUser):
         'Электронная почта', unique=True, max_length=MAX_EMAIL_LENGTH
     )
     avatar = models.ImageField(
-        'Аватар', upload_to='users/', null=True, default=None
+        'Аватар', upload_to='users/', null=True, default=None, db_index=True
+    )
+    avatar_renditions = models.JSONField(
+        'Копии аватара', default=dict, editable=False
+    )
+    recipes_count = models.PositiveIntegerField(
+        'Рецептов', default=0, editable=False
+    )
+    subscribers_count = models.PositiveIntegerField(
+        'Подписчиков', default=0, editable=False
     )
     REQUIRED_FIELDS = ['username', 'first_name', 'last_name', 'password']
     USERNAME_FIELD = 'email'
 
+    objects = UserManager()
+
     class Meta:
         """Метаданные модели."""
 
@@ -94,6 +145,89 @@ class Tag(models.Model):
         return self.name
 
 
+class RecipeQuerySet(models.QuerySet):
+    """Набор запросов рецептов."""
+
+    def for_read(self):
+        """Рецепты со связанными данными.
+
+        Количество запросов не зависит от числа рецептов: автор
+        присоединяется в том же запросе, тэги и продукты подгружаются
+        пакетно. Отметки избранного, корзины и подписки сериализаторы берут
+        из ``api.relations.UserRelations``.
+        """
+        return self.defer('search_vector').select_related(
+            'author'
+        ).prefetch_related(
+            'tags',
+            models.Prefetch(
+                'amounts',
+                queryset=AmountIngredient.objects.select_related('ingredient')
+            ),
+        )
+
+    def search(self, query):
+        """Рецепты, подходящие под запрос, от наиболее релевантных.
+
+        На PostgreSQL используется полнотекстовый поиск по search_vector,
+        на остальных базах — поиск подстроки в названии, описании и
+        названиях продуктов.
+        """
+        if connections[self.db].vendor == 'postgresql':
+            query = SearchQuery(
+                query, config=SEARCH_CONFIG, search_type='websearch'
+            )
+            return self.filter(search_vector=query).annotate(
+                search_rank=SearchRank(models.F('search_vector'), query)
+            ).order_by('-search_rank', '-pub_date')
+        in_name = models.Q(name__icontains=query)
+        in_ingredients = models.Exists(
+            AmountIngredient.objects.filter(
+                recipe=models.OuterRef('pk'),
+                ingredient__name__icontains=query
+            )
+        )
+        return self.filter(
+            in_name | in_ingredients | models.Q(text__icontains=query)
+        ).annotate(
+            search_rank=models.Case(
+                models.When(in_name, then=2),
+                models.When(in_ingredients, then=1),
+                default=0,
+                output_field=models.IntegerField()
+            )
+        ).order_by('-search_rank', '-pub_date')
+
+    def update_search_vector(self):
+        """Пересчитывает поисковый вектор рецептов.
+
+        Вектор строится из названия, названий продуктов и описания с
+        убывающими весами. На базах, отличных от PostgreSQL, ничего не
+        делает.
+        """
+        if connections[self.db].vendor != 'postgresql':
+            return 0
+        ingredient_names = AmountIngredient.objects.filter(
+            recipe=models.OuterRef('pk')
+        ).values('recipe').annotate(
+            names=StringAgg('ingredient__name', delimiter=' ')
+        ).values('names')
+        return self.update(
+            search_vector=(
+                SearchVector('name', weight='A', config=SEARCH_CONFIG)
+                + SearchVector(
+                    Coalesce(
+                        models.Subquery(ingredient_names),
+                        models.Value('')
+                    ),
+                    weight='B',
+                    config=SEARCH_CONFIG
+                )
+                + SearchVector('text', weight='C', config=SEARCH_CONFIG)
+            )
+        )
+
+
 class Recipe(models.Model):
     """Модель рецепта."""
 
@@ -113,12 +247,28 @@ class Recipe(models.Model):
     tags = models.ManyToManyField(
         Tag, related_name='recipes', verbose_name='Тэги'
     )
-    image = models.ImageField('Изображение', upload_to='food/images/')
+    image = models.ImageField(
+        'Изображение', upload_to='food/images/', db_index=True
+    )
+    image_renditions = models.JSONField(
+        'Копии изображения', default=dict, editable=False
+    )
     author = models.ForeignKey(
         User, on_delete=models.CASCADE, related_name='recipes',
         verbose_name='Автор'
     )
     pub_date = models.DateTimeField('Время публикации', auto_now_add=True)
+    updated_at = models.DateTimeField(
+        'Время изменения', auto_now=True, db_index=True
+    )
+    favorites_count = models.PositiveIntegerField(
+        'В избранном', default=0, editable=False
+    )
+    search_vector = SearchVectorField(
+        'Поисковый вектор', null=True, editable=False
+    )
+
+    objects = RecipeQuerySet.as_manager()
 
     class Meta:
         """Метаданные модели."""
@@ -126,12 +276,36 @@ class Recipe(models.Model):
         verbose_name = 'Рецепт'
         verbose_name_plural = 'Рецепты'
         ordering = ('-pub_date',)
+        indexes = [
+            models.Index(
+                fields=['-pub_date', '-id'], name='recipe_pub_date_id_idx'
+            ),
+            models.Index(
+                fields=['author', '-pub_date'], name='recipe_author_date_idx'
+            ),
+        ]
 
     def __str__(self):
         """Возвращает строковое представление модели."""
         return self.name
 
 
+class AmountIngredientQuerySet(models.QuerySet):
+    """Набор запросов количеств продуктов."""
+
+    def shopping_list(self, user):
+        """Суммарное количество каждого продукта из корзины пользователя."""
+        return self.filter(
+            recipe__shoppingcarts__user=user
+        ).values(
+            'ingredient'
+        ).annotate(
+            name=models.F('ingredient__name'),
+            measurement_unit=models.F('ingredient__measurement_unit'),
+            amount=models.Sum('amount')
+        ).order_by('name')
+
+
 class AmountIngredient(models.Model):
     """Модель количества продукта."""
 
@@ -151,6 +325,8 @@ class AmountIngredient(models.Model):
         ]
     )
 
+    objects = AmountIngredientQuerySet.as_manager()
+
     class Meta:
         """Метаданные модели."""
 
@@ -193,6 +369,11 @@ class Subscription(models.Model):
                 name='prevent_self_subscription'
             )
         ]
+        indexes = [
+            models.Index(
+                fields=['author', 'user'], name='subscription_author_user_idx'
+            ),
+        ]
 
     def __str__(self):
         """Возвращает строковое представление модели."""
@@ -220,6 +401,11 @@ class AbstractRecipeUserModel(models.Model):
                 fields=['user', 'recipe'], name='%(class)s_unique_user_recipe'
             )
         ]
+        indexes = [
+            models.Index(
+                fields=['recipe', 'user'], name='%(class)s_recipe_user_idx'
+            ),
+        ]
 
     def __str__(self):
         """Возвращает строковое представление модели."""
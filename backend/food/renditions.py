@@ -0,0 +1,122 @@
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connections, transaction
+from django.dispatch import Signal
+from PIL import Image, ImageOps
+
+from .constants import RENDITION_QUALITY
+
+logger = logging.getLogger(__name__)
+
+# Отправляется после сохранения копий: sender — модель, pk — id объекта.
+renditions_built = Signal()
+
+# Пул фоновых потоков процесса, создаётся при первой задаче.
+_executor = None
+
+
+def get_executor():
+    """Пул потоков для построения уменьшенных копий."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.IMAGE_RENDITION_WORKERS,
+            thread_name_prefix='renditions'
+        )
+    return _executor
+
+
+def rendition_name(name, rendition):
+    """Путь уменьшенной копии рядом с исходным файлом.
+
+    Имя копии содержит полное имя исходного файла, поэтому по нему
+    восстанавливается исходник, см. ``rendition_source``.
+    """
+    directory, filename = os.path.split(name)
+    return os.path.join(
+        directory, 'renditions', f'{filename}.{rendition}.webp'
+    )
+
+
+def rendition_source(path):
+    """Имя исходного файла копии или None, если путь не имя копии."""
+    directory, filename = os.path.split(path)
+    parent, folder = os.path.split(directory)
+    source, _, rendition = filename[:-len('.webp')].rpartition('.')
+    if (
+        folder != 'renditions'
+        or not filename.endswith('.webp')
+        or not os.path.splitext(source)[1]
+    ):
+        return None
+    name = os.path.join(parent, source)
+    return name if rendition_name(name, rendition) == path else None
+
+
+def render(file, sizes, storage):
+    """Сохраняет копии изображения в WebP и возвращает их пути."""
+    paths = {'source': file.name}
+    with file.open('rb'), Image.open(file) as image:
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA')
+        for rendition, size in sizes.items():
+            copy = image.copy()
+            copy.thumbnail((size, size), Image.LANCZOS)
+            buffer = BytesIO()
+            copy.save(buffer, 'WEBP', quality=RENDITION_QUALITY)
+            paths[rendition] = storage.save_as(
+                rendition_name(file.name, rendition),
+                ContentFile(buffer.getvalue())
+            )
+    return paths
+
+
+def build_renditions(model, pk, field_name, sizes):
+    """Строит копии текущего изображения объекта и запоминает их.
+
+    Копии сохраняются, только если за время работы изображение не
+    заменили: иначе их построит задача, поставленная для нового файла.
+    """
+    try:
+        instance = model.objects.only(field_name).filter(pk=pk).first()
+        file = getattr(instance, field_name, None)
+        if not file:
+            return
+        paths = render(file, sizes, file.storage)
+        if model.objects.filter(pk=pk, **{field_name: file.name}).update(
+            **{f'{field_name}_renditions': paths}
+        ):
+            renditions_built.send(sender=model, pk=pk)
+    except Exception:
+        logger.exception(
+            'Не удалось построить копии %s.%s для %s',
+            model.__name__, field_name, pk
+        )
+    finally:
+        if settings.IMAGE_RENDITIONS_ASYNC:
+            connections.close_all()
+
+
+def schedule_renditions(instance, field_name, sizes):
+    """Ставит построение копий в очередь после фиксации транзакции.
+
+    Ничего не делает, если копии текущего файла уже построены.
+    """
+    file = getattr(instance, field_name)
+    renditions = getattr(instance, f'{field_name}_renditions')
+    if not file or renditions.get('source') == file.name:
+        return
+    task = partial(
+        build_renditions, type(instance), instance.pk, field_name, sizes
+    )
+    if settings.IMAGE_RENDITIONS_ASYNC:
+        transaction.on_commit(partial(get_executor().submit, task))
+    else:
+        transaction.on_commit(task)
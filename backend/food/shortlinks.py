@@ -0,0 +1,125 @@
+import threading
+import time
+
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+from .constants import (
+    SHORT_CODE_ALPHABET,
+    SHORT_CODE_LENGTH,
+    SHORT_CODE_MULTIPLIER
+)
+
+RECIPE_IDS_VERSION_KEY = 'recipes:ids:version'
+MODULUS = len(SHORT_CODE_ALPHABET) ** SHORT_CODE_LENGTH
+INVERSE = pow(SHORT_CODE_MULTIPLIER, -1, MODULUS)
+DIGITS = {char: value for value, char in enumerate(SHORT_CODE_ALPHABET)}
+
+
+def encode(pk):
+    """Короткий код рецепта: перемешанный id в base62."""
+    value = pk * SHORT_CODE_MULTIPLIER % MODULUS
+    chars = []
+    for _ in range(SHORT_CODE_LENGTH):
+        value, digit = divmod(value, len(SHORT_CODE_ALPHABET))
+        chars.append(SHORT_CODE_ALPHABET[digit])
+    return ''.join(reversed(chars))
+
+
+def decode(code):
+    """id рецепта по короткому коду или None для некорректного кода."""
+    if len(code) != SHORT_CODE_LENGTH:
+        return None
+    value = 0
+    for char in code:
+        if char not in DIGITS:
+            return None
+        value = value * len(SHORT_CODE_ALPHABET) + DIGITS[char]
+    return value * INVERSE % MODULUS or None
+
+
+class RecipeIdIndex:
+    """Битовая карта id существующих рецептов процесса.
+
+    Строится одним запросом при первом обращении и поддерживается
+    сигналами. Создание и удаление рецепта увеличивает версию в общем кэше
+    Django, и другие процессы перестраивают карту при следующей проверке.
+    Если кэш не общий для процессов, рецепт, созданный в другом процессе,
+    находится одним запросом при первом промахе и добавляется в карту.
+    """
+
+    def __init__(self):
+        self.bits = bytearray()
+        self.version = None
+        self.lock = threading.Lock()
+
+    def __contains__(self, pk):
+        """Есть ли рецепт с таким id."""
+        if self.version != self.current_version():
+            self.rebuild()
+        byte, bit = divmod(pk, 8)
+        if byte < len(self.bits) and self.bits[byte] >> bit & 1:
+            return True
+        return self.fetch(pk)
+
+    def fetch(self, pk):
+        """Проверяет промах по основной базе и запоминает найденный id."""
+        from .models import Recipe
+
+        if not Recipe.objects.using(DEFAULT_DB_ALIAS).filter(pk=pk).exists():
+            return False
+        with self.lock:
+            self.set(self.bits, pk)
+        return True
+
+    @staticmethod
+    def current_version():
+        """Версия набора рецептов из общего кэша."""
+        cache.add(RECIPE_IDS_VERSION_KEY, time.time_ns(), timeout=None)
+        return cache.get(RECIPE_IDS_VERSION_KEY)
+
+    def rebuild(self):
+        """Перечитывает id всех рецептов из основной базы."""
+        from .models import Recipe
+
+        with self.lock:
+            version = self.current_version()
+            bits = bytearray()
+            for pk in Recipe.objects.using(DEFAULT_DB_ALIAS).values_list(
+                'pk', flat=True
+            ).iterator():
+                self.set(bits, pk)
+            self.bits, self.version = bits, version
+
+    @staticmethod
+    def set(bits, pk, value=True):
+        """Устанавливает или сбрасывает бит id в карте."""
+        byte, bit = divmod(pk, 8)
+        if byte >= len(bits):
+            if not value:
+                return
+            bits.extend(bytes(byte + 1 - len(bits)))
+        if value:
+            bits[byte] |= 1 << bit
+        else:
+            bits[byte] &= ~(1 << bit)
+
+    def changed(self, pk, exists):
+        """Отмечает создание или удаление рецепта после фиксации.
+
+        Карта процесса правится на месте, только если до этого она была
+        актуальна и никто другой не изменил версию одновременно с нами.
+        """
+        with self.lock:
+            previous = self.current_version()
+            try:
+                version = cache.incr(RECIPE_IDS_VERSION_KEY)
+            except ValueError:
+                cache.set(RECIPE_IDS_VERSION_KEY, time.time_ns(), timeout=None)
+                return
+            if self.version == previous and version == previous + 1:
+                self.set(self.bits, pk, exists)
+                self.version = version
+
+
+recipe_ids = RecipeIdIndex()
@@ -0,0 +1,203 @@
+from collections import Counter
+from functools import partial
+
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete
+)
+from django.dispatch import Signal, receiver
+from django.utils import timezone
+
+from .constants import AVATAR_RENDITIONS, IMAGE_RENDITIONS
+from .models import (
+    AmountIngredient,
+    Favorite,
+    Ingredient,
+    Recipe,
+    Subscription,
+    Tag,
+    User
+)
+from .renditions import renditions_built, schedule_renditions
+from .shortlinks import recipe_ids
+from .storage import release_on_commit
+
+# Поля пользователя, показываемые в рецептах как данные автора.
+AUTHOR_FIELDS = frozenset(
+    ('username', 'first_name', 'last_name', 'email', 'avatar')
+)
+
+# Отправляется после добавления рецептов: sender — Recipe, recipes — список.
+recipes_added = Signal()
+
+
+def update_search_vectors(recipe_ids):
+    """Пересчитывает поисковые векторы рецептов одним запросом."""
+    Recipe.objects.filter(pk__in=recipe_ids).update_search_vector()
+
+
+def update_search_vector_on_commit(recipe_id):
+    """Пересчитывает поисковый вектор рецепта после фиксации транзакции.
+
+    Откладывание нужно, чтобы продукты, созданные через bulk_create в той
+    же транзакции, попали в вектор. id рецептов транзакции собираются в
+    одно множество соединения, поэтому изменение многих продуктов рецепта
+    пересчитывает его вектор один раз. Пересчёт, поставленный во
+    вложенной точке сохранения, отменяется её откатом, и тогда множество
+    заводится заново.
+    """
+    connection = transaction.get_connection()
+    if not connection.in_atomic_block:
+        update_search_vectors([recipe_id])
+        return
+    update = getattr(connection, 'search_vector_update', None)
+    # Блоки atomic без точки сохранения отмечены в savepoint_ids как None.
+    savepoints = set(connection.savepoint_ids) | {None}
+    if update is None or not any(
+        entry[1] is update and entry[0] <= savepoints
+        for entry in connection.run_on_commit
+    ):
+        update = partial(update_search_vectors, set())
+        connection.search_vector_update = update
+        transaction.on_commit(update)
+    update.args[0].add(recipe_id)
+
+
+def recipes_created(recipes):
+    """Обновляет всё, что зависит от появления новых рецептов.
+
+    Вызывается сигналом post_save для одного рецепта и массовым
+    импортом для блока рецептов, добавленных через bulk_create без
+    сигналов моделей. Счётчики меняются одним запросом на автора.
+    """
+    authors = Counter(recipe.author_id for recipe in recipes)
+    for author_id, count in authors.items():
+        change_counter(User, author_id, 'recipes_count', count)
+    for recipe in recipes:
+        transaction.on_commit(partial(recipe_ids.changed, recipe.pk, True))
+        update_search_vector_on_commit(recipe.pk)
+        schedule_renditions(recipe, 'image', IMAGE_RENDITIONS)
+    recipes_added.send(sender=Recipe, recipes=recipes)
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_saved(sender, instance, created=False, **kwargs):
+    """Обновляет поисковый вектор и копии изображения рецепта."""
+    if created:
+        recipes_created([instance])
+        return
+    update_search_vector_on_commit(instance.pk)
+    schedule_renditions(instance, 'image', IMAGE_RENDITIONS)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created=False, update_fields=None,
+               **kwargs):
+    """Строит копии нового аватара и отмечает изменёнными рецепты автора."""
+    schedule_renditions(instance, 'avatar', AVATAR_RENDITIONS)
+    if not created and (
+        update_fields is None or AUTHOR_FIELDS.intersection(update_fields)
+    ):
+        touch_recipes(author=instance)
+
+
+@receiver(post_delete, sender=Recipe)
+def recipe_deleted(sender, instance, **kwargs):
+    """Удаляет изображение рецепта, если на него больше никто не ссылается."""
+    release_on_commit(instance, 'image')
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    """Удаляет аватар, если на него больше никто не ссылается."""
+    release_on_commit(instance, 'avatar')
+
+
+def touch_recipes(**lookups):
+    """Обновляет время изменения рецептов, чьё представление изменилось."""
+    Recipe.objects.filter(**lookups).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Tag)
+@receiver(pre_delete, sender=Tag)
+def tag_changed(sender, instance, **kwargs):
+    """Отмечает изменёнными рецепты с изменённым или удаляемым тэгом."""
+    touch_recipes(tags=instance)
+
+
+@receiver(post_save, sender=Ingredient)
+@receiver(pre_delete, sender=Ingredient)
+def ingredient_changed(sender, instance, **kwargs):
+    """Отмечает изменёнными рецепты с изменённым или удаляемым продуктом."""
+    touch_recipes(ingredients=instance)
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+def recipe_tags_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """Отмечает изменёнными рецепты, у которых поменялись тэги."""
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            touch_recipes(pk=instance.pk)
+    elif action in ('post_add', 'post_remove'):
+        touch_recipes(pk__in=pk_set)
+    elif action == 'pre_clear':
+        touch_recipes(tags=instance)
+
+
+@receiver(renditions_built)
+def renditions_changed(sender, pk, **kwargs):
+    """Отмечает изменёнными рецепты с новыми копиями изображений."""
+    touch_recipes(**{'pk' if sender is Recipe else 'author': pk})
+
+
+@receiver(post_save, sender=AmountIngredient)
+@receiver(post_delete, sender=AmountIngredient)
+def amount_changed(sender, instance, **kwargs):
+    """Обновляет поисковый вектор рецепта при изменении его продуктов."""
+    update_search_vector_on_commit(instance.recipe_id)
+
+
+def change_counter(model, pk, field, delta):
+    """Атомарно изменяет счётчик строки, не опуская его ниже нуля."""
+    model.objects.filter(pk=pk).update(
+        **{field: Greatest(F(field) + delta, 0)}
+    )
+
+
+@receiver(post_save, sender=Favorite)
+@receiver(post_delete, sender=Favorite)
+def favorite_changed(sender, instance, created=False, **kwargs):
+    """Пересчитывает число добавлений рецепта в избранное."""
+    if kwargs['signal'] is post_save and not created:
+        return
+    change_counter(
+        Recipe, instance.recipe_id, 'favorites_count', 1 if created else -1
+    )
+
+
+@receiver(post_save, sender=Subscription)
+@receiver(post_delete, sender=Subscription)
+def subscription_changed(sender, instance, created=False, **kwargs):
+    """Пересчитывает число подписчиков автора."""
+    if kwargs['signal'] is post_save and not created:
+        return
+    change_counter(
+        User, instance.author_id, 'subscribers_count', 1 if created else -1
+    )
+
+
+@receiver(post_delete, sender=Recipe)
+def recipe_count_changed(sender, instance, **kwargs):
+    """Уменьшает число рецептов автора."""
+    change_counter(User, instance.author_id, 'recipes_count', -1)
+
+
+@receiver(post_delete, sender=Recipe)
+def recipe_ids_changed(sender, instance, **kwargs):
+    """Убирает рецепт из индекса id для коротких ссылок."""
+    transaction.on_commit(partial(recipe_ids.changed, instance.pk, False))
@@ -0,0 +1,92 @@
+import hashlib
+import os
+from functools import partial
+
+from django.apps import apps
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.db import transaction
+
+from .renditions import rendition_name
+
+# Поля моделей, ссылающиеся на файлы хранилища, и поля с их копиями.
+MEDIA_FIELDS = (
+    ('food.Recipe', 'image', 'image_renditions'),
+    ('food.User', 'avatar', 'avatar_renditions'),
+)
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """Хранилище, называющее файлы по хэшу содержимого.
+
+    Файл сохраняется в каталог исходного имени под именем из SHA-256
+    содержимого, поэтому одинаковые загрузки хранятся один раз.
+    """
+
+    def save(self, name, content, max_length=None):
+        """Сохраняет файл, если файла с таким содержимым ещё нет."""
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+        digest = digest.hexdigest()
+        directory, filename = os.path.split(name)
+        name = os.path.join(
+            directory,
+            digest[:2],
+            digest + os.path.splitext(filename)[1].lower()
+        )
+        if self.exists(name):
+            return name
+        return super().save(name, content, max_length)
+
+    def save_as(self, name, content):
+        """Сохраняет файл под заданным именем, заменяя прежний.
+
+        Нужен для копий изображений: их имена выводятся из имени
+        исходного файла, поэтому копии разных исходников не совпадают и
+        удаляются вместе со своим исходником.
+        """
+        self.delete(name)
+        return super().save(name, content)
+
+
+def count_references(name):
+    """Число объектов, ссылающихся на файл."""
+    return sum(
+        apps.get_model(model).objects.filter(**{field: name}).count()
+        for model, field, _ in MEDIA_FIELDS
+    )
+
+
+def release(name, renditions=None):
+    """Удаляет файл и его копии, если на файл больше никто не ссылается.
+
+    Удаляются только копии с именами, выведенными из имени файла: такие
+    принадлежат только ему. Копии, сохранённые раньше под хэшем
+    содержимого, могут быть общими и остаются для gc_media.
+    """
+    if not name or count_references(name):
+        return
+    default_storage.delete(name)
+    if renditions and renditions.get('source') == name:
+        for rendition, path in renditions.items():
+            if path == rendition_name(name, rendition):
+                default_storage.delete(path)
+
+
+def release_on_commit(instance, field_name):
+    """Освобождает текущий файл поля объекта после фиксации транзакции.
+
+    Вызывается до замены или удаления файла: если после фиксации на файл
+    никто не ссылается, он удаляется вместе с копиями.
+    """
+    transaction.on_commit(partial(
+        release,
+        getattr(instance, field_name).name,
+        getattr(instance, f'{field_name}_renditions')
+    ))
@@ -0,0 +1,81 @@
+import binascii
+import uuid
+
+from django.conf import settings
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from PIL import Image
+from rest_framework import serializers
+
+# Размер части строки base64, декодируемой за раз; кратен 4.
+BASE64_CHUNK_SIZE = 64 * 1024
+IMAGE_FORMATS = {'JPEG': 'jpg', 'PNG': 'png', 'GIF': 'gif', 'WEBP': 'webp'}
+
+
+class TemporaryImageFile(TemporaryUploadedFile):
+    """Временный файл загрузки, закрываемый вместе с объектом.
+
+    Хранилище перемещает такой файл на постоянное место, поэтому он
+    закрывается через ``close``, которому отсутствие файла не мешает.
+    """
+
+    def __init__(self, content_type=None):
+        super().__init__('upload', content_type, 0, None)
+
+    def __del__(self):
+        self.close()
+
+
+def check_size(size):
+    """Проверка размера файла до его чтения."""
+    if size > settings.MAX_IMAGE_UPLOAD_SIZE:
+        raise serializers.ValidationError(
+            'Размер файла превышает {} байт'.format(
+                settings.MAX_IMAGE_UPLOAD_SIZE
+            )
+        )
+
+
+def decode_base64_upload(data):
+    """Декодирует строку base64 частями во временный файл."""
+    encoded = data.rpartition(';base64,')[2]
+    check_size(len(encoded) * 3 // 4 - encoded[-2:].count('='))
+    file = TemporaryImageFile()
+    try:
+        for start in range(0, len(encoded), BASE64_CHUNK_SIZE):
+            file.write(binascii.a2b_base64(
+                encoded[start:start + BASE64_CHUNK_SIZE]
+            ))
+    except (binascii.Error, ValueError):
+        file.close()
+        raise serializers.ValidationError('Неверная строка base64')
+    file.size = file.tell()
+    file.seek(0)
+    return file
+
+
+def prepare_image(file):
+    """Проверяет изображение по заголовку и даёт файлу случайное имя.
+
+    Формат и разрешение читаются без декодирования изображения, поэтому
+    слишком большие картинки отклоняются до их полной обработки.
+    """
+    check_size(file.size)
+    try:
+        with Image.open(file) as image:
+            image_format = image.format
+            width, height = image.size
+    except (OSError, Image.DecompressionBombError):
+        raise serializers.ValidationError('Файл не является изображением')
+    if image_format not in IMAGE_FORMATS:
+        raise serializers.ValidationError(
+            'Поддерживаются форматы: {}'.format(', '.join(IMAGE_FORMATS))
+        )
+    if width * height > settings.MAX_IMAGE_PIXELS:
+        raise serializers.ValidationError(
+            'Разрешение изображения превышает {} пикселей'.format(
+                settings.MAX_IMAGE_PIXELS
+            )
+        )
+    file.seek(0)
+    file.name = f'{uuid.uuid4()}.{IMAGE_FORMATS[image_format]}'
+    return file
@@ -5,5 +5,5 @@ from .views import RecipeRedirectView
 app_name = 'food'
 
 urlpatterns = [
-    path('s/<int:pk>/', RecipeRedirectView.as_view(), name='short-link')
+    path('s/<str:code>/', RecipeRedirectView.as_view(), name='short-link')
 ]
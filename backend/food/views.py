@@ -1,14 +1,23 @@
 from django.shortcuts import redirect
 from django.views import View
 
-from .models import Recipe
+from .constants import SHORT_CODE_LENGTH
+from .shortlinks import decode, recipe_ids
 
 
 class RecipeRedirectView(View):
     """Перенаправление на страницу рецепта."""
 
-    def get(self, request, pk=None):
-        """Перенаправление на страницу рецепта."""
-        if not Recipe.objects.filter(pk=pk).exists():
+    def get(self, request, code=None):
+        """Перенаправление на страницу рецепта.
+
+        Наличие рецепта проверяется по индексу id без запроса к базе.
+        Числовые коды короче коротких — id из ссылок старого формата.
+        """
+        if code.isdigit() and len(code) < SHORT_CODE_LENGTH:
+            pk = int(code)
+        else:
+            pk = decode(code)
+        if pk is None or pk not in recipe_ids:
             return redirect('/404/')
         return redirect(f'/recipes/{pk}/')
@@ -0,0 +1,94 @@
+"""PostgreSQL с пулом соединений процесса и проверкой их исправности.
+
+Подключается как ``ENGINE = 'foodgram_backend.db'``. Настройки пула задаются
+ключом ``POOL`` в описании базы: ``MAX_SIZE``, ``TIMEOUT``, ``MAX_IDLE`` и
+``CHECK_INTERVAL``. При ``CONN_HEALTH_CHECKS`` соединение, оставшееся у
+потока с прошлого запроса (``CONN_MAX_AGE``), проверяется перед первым
+использованием в новом запросе.
+"""
+from django.db.backends.postgresql import base
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+
+from .pool import get_pool
+
+
+def ping(connection):
+    """Проверяет соединение запросом SELECT 1."""
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+    reset(connection)
+    return True
+
+
+def reset(connection):
+    """Откатывает незавершённую транзакцию соединения."""
+    if connection.closed:
+        raise base.Database.InterfaceError('Соединение закрыто')
+    if connection.get_transaction_status() != TRANSACTION_STATUS_IDLE:
+        connection.rollback()
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """Соединения берутся из пула процесса и возвращаются в него."""
+
+    health_check_done = False
+
+    @property
+    def pool(self):
+        """Пул соединений этой базы.
+
+        Имя базы входит в имя пула: при запуске тестов описание базы
+        меняется на тестовую, и соединения с рабочей базой не годятся.
+        """
+        options = self.settings_dict.get('POOL', {})
+        return get_pool(
+            f'{self.alias}:{self.settings_dict["NAME"]}',
+            connect=self.connect_to_database,
+            max_size=options.get('MAX_SIZE', 10),
+            timeout=options.get('TIMEOUT', 10),
+            max_idle=options.get('MAX_IDLE', 300),
+            check_interval=options.get('CHECK_INTERVAL', 30),
+            check=ping,
+            reset=reset
+        )
+
+    def connect_to_database(self):
+        """Открывает новое соединение с базой."""
+        return super().get_new_connection(self.get_connection_params())
+
+    def get_new_connection(self, conn_params):
+        """Соединение из пула."""
+        connection = self.pool.acquire()
+        self.isolation_level = self.settings_dict['OPTIONS'].get(
+            'isolation_level', connection.isolation_level
+        )
+        return connection
+
+    def connect(self):
+        """Новому соединению из пула проверка в этом запросе не нужна."""
+        super().connect()
+        self.health_check_done = True
+
+    def _close(self):
+        """Возвращает соединение в пул вместо закрытия."""
+        if self.connection is not None:
+            self.pool.release(self.connection)
+
+    def close_if_unusable_or_obsolete(self):
+        """Вызывается в начале и конце запроса: сбрасывает флаг проверки."""
+        super().close_if_unusable_or_obsolete()
+        self.health_check_done = False
+
+    def ensure_connection(self):
+        """Проверяет сохранённое соединение один раз за запрос."""
+        if (
+            self.connection is not None
+            and not self.health_check_done
+            and not self.in_atomic_block
+            and self.settings_dict.get('CONN_HEALTH_CHECKS')
+        ):
+            self.health_check_done = True
+            if not self.is_usable():
+                self.close()
+                self.pool.count('reconnects')
+        super().ensure_connection()
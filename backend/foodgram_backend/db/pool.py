@@ -0,0 +1,157 @@
+import os
+import threading
+import time
+from collections import Counter, deque
+
+from django.db.utils import OperationalError
+
+# Пулы процесса: {(pid, имя пула): пул}. pid нужен, чтобы дочерний
+# процесс после fork не пользовался соединениями родителя.
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class ConnectionPool:
+    """Ограниченный пул соединений с базой, общий для потоков процесса.
+
+    ``connect`` открывает новое соединение, ``check`` проверяет соединение,
+    пролежавшее в пуле дольше ``check_interval`` секунд, а ``reset``
+    возвращает соединение в исходное состояние перед возвратом в пул.
+    Соединения, простаивающие дольше ``max_idle`` секунд, закрываются.
+    """
+
+    def __init__(self, connect, max_size=10, timeout=10, max_idle=300,
+                 check_interval=30, check=None, reset=None):
+        self.connect = connect
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.check_interval = check_interval
+        self.check = check or (lambda connection: True)
+        self.reset = reset or (lambda connection: connection.rollback())
+        # Свободные соединения: (соединение, время возврата в пул).
+        self.idle = deque()
+        self.size = 0
+        self.counters = Counter()
+        self.condition = threading.Condition()
+
+    def acquire(self):
+        """Свободное соединение из пула или новое, если пул не заполнен.
+
+        Когда все соединения заняты, ждёт освобождения не дольше
+        ``timeout`` секунд.
+        """
+        with self.condition:
+            self.close_expired()
+            if not self.idle and self.size >= self.max_size:
+                self.counters['waits'] += 1
+                if not self.condition.wait_for(
+                    lambda: self.idle or self.size < self.max_size,
+                    self.timeout
+                ):
+                    self.counters['timeouts'] += 1
+                    raise OperationalError(
+                        f'Нет свободных соединений за {self.timeout} с'
+                    )
+            if self.idle:
+                connection, released_at = self.idle.pop()
+            else:
+                connection, released_at = None, None
+                self.size += 1
+        if connection is not None:
+            if time.monotonic() - released_at < self.check_interval:
+                return connection
+            if self.usable(connection):
+                return connection
+            self.close(connection)
+            self.count('reconnects')
+        try:
+            connection = self.connect()
+        except Exception:
+            self.discard()
+            raise
+        self.count('connects')
+        return connection
+
+    def release(self, connection):
+        """Возвращает соединение в пул или закрывает неисправное."""
+        try:
+            self.reset(connection)
+        except Exception:
+            self.close(connection)
+            self.discard()
+            return
+        with self.condition:
+            self.idle.append((connection, time.monotonic()))
+            self.condition.notify()
+
+    def count(self, name):
+        """Увеличивает счётчик статистики."""
+        with self.condition:
+            self.counters[name] += 1
+
+    def discard(self):
+        """Освобождает место закрытого соединения."""
+        with self.condition:
+            self.size -= 1
+            self.condition.notify()
+
+    def usable(self, connection):
+        """Проверяет соединение перед повторным использованием."""
+        try:
+            return self.check(connection)
+        except Exception:
+            return False
+
+    @staticmethod
+    def close(connection):
+        """Закрывает соединение, не обращая внимания на ошибки."""
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def close_expired(self):
+        """Закрывает самые старые свободные соединения сверх max_idle."""
+        deadline = time.monotonic() - self.max_idle
+        while self.idle and self.idle[0][1] < deadline:
+            self.close(self.idle.popleft()[0])
+            self.size -= 1
+            self.counters['expired'] += 1
+
+    def stats(self):
+        """Состояние пула для мониторинга."""
+        with self.condition:
+            return {
+                'max_size': self.max_size,
+                'size': self.size,
+                'in_use': self.size - len(self.idle),
+                'idle': len(self.idle),
+                'connects': self.counters['connects'],
+                'reconnects': self.counters['reconnects'],
+                'waits': self.counters['waits'],
+                'timeouts': self.counters['timeouts'],
+                'expired': self.counters['expired'],
+            }
+
+
+def get_pool(name, **kwargs):
+    """Пул соединений процесса, создаётся при первом обращении."""
+    key = (os.getpid(), name)
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = _pools[key] = ConnectionPool(**kwargs)
+    return pool
+
+
+def pool_stats():
+    """Состояние пулов текущего процесса по их именам."""
+    pid = os.getpid()
+    return {
+        name: pool.stats()
+        for (pool_pid, name), pool in list(_pools.items())
+        if pool_pid == pid
+    }
@@ -0,0 +1,84 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+PIN_KEY = 'replicas:pin:{}'
+
+# Можно ли текущему запросу читать из реплик.
+_replica_reads = ContextVar('replica_reads', default=False)
+
+
+def replica_reads_enabled():
+    """Читает ли текущий запрос из реплик."""
+    return _replica_reads.get()
+
+
+@contextmanager
+def replica_reads(enabled=True):
+    """Включает или выключает чтение из реплик внутри блока."""
+    token = _replica_reads.set(enabled and bool(settings.DATABASE_REPLICAS))
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def allow_replica_reads():
+    """Разрешает чтение из реплик до конца объемлющего блока replica_reads."""
+    _replica_reads.set(bool(settings.DATABASE_REPLICAS))
+
+
+def primary():
+    """Блок, читающий только из основной базы.
+
+    Нужен там, где прочитанное сохраняется в кэш под новой версией: с
+    отстающей реплики туда попали бы устаревшие данные.
+    """
+    return replica_reads(False)
+
+
+def pin_to_primary(user_id):
+    """Читать только из основной базы после записи пользователя.
+
+    Закрепление действует REPLICA_PIN_TIMEOUT секунд — дольше задержки
+    репликации, — чтобы пользователь сразу видел свои изменения.
+    """
+    cache.set(PIN_KEY.format(user_id), True, settings.REPLICA_PIN_TIMEOUT)
+
+
+def is_pinned(user_id):
+    """Читает ли пользователь сейчас только из основной базы."""
+    return bool(cache.get(PIN_KEY.format(user_id)))
+
+
+class ReplicaRouter:
+    """Отправляет чтения в реплики, если их разрешил текущий запрос.
+
+    Записи всегда идут в основную базу, миграции к репликам не
+    применяются: это копии основной базы.
+    """
+
+    def db_for_read(self, model, **hints):
+        """Случайная реплика или основная база."""
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db:
+            return instance._state.db
+        if replica_reads_enabled():
+            return random.choice(settings.DATABASE_REPLICAS)
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        """Основная база."""
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        """Реплики содержат те же данные, что и основная база."""
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        """Миграции только для основной базы."""
+        return db not in settings.DATABASE_REPLICAS
@@ -1,5 +1,7 @@
 # flake8: noqa
 import os
+import tempfile
+from datetime import timedelta
 from pathlib import Path
 from django.core.management.utils import get_random_secret_key
 
@@ -73,15 +75,88 @@ if DEBUG:
 else:
     DATABASES = {
         'default': {
-            'ENGINE': 'django.db.backends.postgresql',
+            # PostgreSQL с пулом соединений процесса: foodgram_backend/db.
+            'ENGINE': 'foodgram_backend.db',
             'NAME': os.getenv('POSTGRES_DB', 'django'),
             'USER': os.getenv('POSTGRES_USER', 'django'),
             'PASSWORD': os.getenv('POSTGRES_PASSWORD', ''),
             'HOST': os.getenv('DB_HOST', ''),
-            'PORT': os.getenv('DB_PORT', 5432)
+            'PORT': os.getenv('DB_PORT', 5432),
+            'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE') or 60),
+            'CONN_HEALTH_CHECKS': True,
+            'POOL': {
+                'MAX_SIZE': int(os.getenv('DB_POOL_SIZE') or 10),
+                'TIMEOUT': int(os.getenv('DB_POOL_TIMEOUT') or 10),
+                'MAX_IDLE': int(os.getenv('DB_POOL_MAX_IDLE') or 300),
+            },
         }
     }
 
+# Реплики для чтения: пути к файлам SQLite в режиме отладки или адреса
+# серверов PostgreSQL через запятую. Чтения GET-запросов к API идут в
+# реплики, пользователь после записи REPLICA_PIN_TIMEOUT секунд читает из
+# основной базы.
+DATABASE_REPLICAS = []
+for number, replica in enumerate(
+    filter(None, os.getenv('DB_REPLICAS', '').split(',')), start=1
+):
+    alias = f'replica{number}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'NAME' if DEBUG else 'HOST': replica.strip(),
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(alias)
+DATABASE_ROUTERS = ['foodgram_backend.db.routers.ReplicaRouter']
+REPLICA_PIN_TIMEOUT = int(os.getenv('REPLICA_PIN_TIMEOUT') or 5)
+
+
+# Кэш по умолчанию хранит версии справочников, индекса коротких ссылок,
+# отозванные токены и закрепления за основной базой, поэтому он должен быть
+# общим для всех процессов: иначе изменения из команд import_catalog и
+# import_recipes и из других воркеров не видны до перезапуска. По
+# умолчанию — файлы во временном каталоге, общие для процессов одной машины;
+# для нескольких машин — Redis-совместимый бэкенд.
+CACHE_DIR = os.path.join(tempfile.gettempdir(), 'foodgram_cache')
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND') or 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv('CACHE_LOCATION') or os.path.join(CACHE_DIR, 'default'),
+    },
+    # Ответы API для анонимных пользователей: FileBasedCache или
+    # Redis-совместимый бэкенд, общий для всех процессов.
+    'responses': {
+        'BACKEND': os.getenv('RESPONSE_CACHE_BACKEND') or 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv('RESPONSE_CACHE_LOCATION') or os.path.join(CACHE_DIR, 'responses'),
+    },
+}
+
+# Время жизни кэшированных ответов в секундах, 0 — кэш выключен.
+RESPONSE_CACHE_TIMEOUT = int(os.getenv('RESPONSE_CACHE_TIMEOUT') or 0)
+
+# Поиск продуктов по индексу в памяти вместо запроса к базе.
+INGREDIENT_SEARCH_INDEX = os.getenv('INGREDIENT_SEARCH_INDEX', 'True') == 'True'
+
+# Время жизни кэша избранного, корзины и подписок пользователя между
+# запросами в секундах, 0 — только в пределах запроса. Как и версии
+# справочников, требует общего для процессов CACHE_BACKEND.
+RELATIONS_CACHE_TIMEOUT = int(os.getenv('RELATIONS_CACHE_TIMEOUT') or 0)
+
+# Уменьшенные копии изображений строятся в пуле фоновых потоков; при
+# False — сразу после фиксации транзакции в том же потоке.
+IMAGE_RENDITIONS_ASYNC = os.getenv('IMAGE_RENDITIONS_ASYNC', 'True') == 'True'
+IMAGE_RENDITION_WORKERS = int(os.getenv('IMAGE_RENDITION_WORKERS') or 2)
+
+# Ограничения загружаемых изображений: размер файла в байтах и разрешение.
+MAX_IMAGE_UPLOAD_SIZE = int(
+    os.getenv('MAX_IMAGE_UPLOAD_SIZE') or 20 * 1024 * 1024
+)
+MAX_IMAGE_PIXELS = int(os.getenv('MAX_IMAGE_PIXELS') or 50_000_000)
+
+# Число рецептов в одной транзакции массового импорта и в одном запросе
+# выгрузки.
+RECIPE_BULK_CHUNK_SIZE = int(os.getenv('RECIPE_BULK_CHUNK_SIZE') or 500)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -122,6 +197,8 @@ STATIC_ROOT = '/backend_static/static/'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = '/media/'
 
+DEFAULT_FILE_STORAGE = 'food.storage.ContentAddressedStorage'
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = 'food.User'
@@ -141,11 +218,22 @@ DJOSER = {
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'api.authentication.SignedTokenAuthentication',
     ],
     'DEFAULT_PAGINATION_CLASS': 'api.paginations.PageSizeLimitPagination',
     'PAGE_SIZE': 10,
 }
 
+# Вход выдаёт подписанные токены доступа, которые проверяются без запросов к
+# базе. Подпись — SECRET_KEY, поэтому он должен быть общим для всех процессов.
+SIGNED_TOKENS = os.getenv('SIGNED_TOKENS', 'True') == 'True'
+SIMPLE_JWT = {
+    'ACCESS_TOKEN_LIFETIME': timedelta(
+        minutes=int(os.getenv('ACCESS_TOKEN_LIFETIME') or 720)
+    ),
+    'USER_ID_CLAIM': 'user_id',
+    'AUTH_HEADER_TYPES': ('Token',),
+}
+
 
 CSRF_TRUSTED_ORIGINS = os.getenv('CSRF_TRUSTED_ORIGINS', '').split(' ')
@@ -0,0 +1,113 @@
+import os
+import random
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from rest_framework.authtoken.models import Token
+
+from food.models import (
+    AmountIngredient,
+    Favorite,
+    Ingredient,
+    Recipe,
+    ShoppingCart,
+    Subscription,
+    Tag
+)
+
+User = get_user_model()
+
+SCALE = float(os.getenv('BENCHMARK_SCALE', '1'))
+INGREDIENTS_PER_RECIPE = 6
+TAGS_PER_RECIPE = 2
+TAGS_COUNT = 8
+USERS_COUNT = max(2, int(2000 * SCALE))
+RECIPES_COUNT = max(1, int(3000 * SCALE))
+INGREDIENTS_COUNT = max(INGREDIENTS_PER_RECIPE, int(2000 * SCALE))
+RELATIONS_PER_USER = 3
+READER_RELATIONS = 60
+
+
+def seed_dataset(seed=0):
+    """Заполняет базу синтетическими данными и возвращает читателя.
+
+    Читатель подписан на ``READER_RELATIONS`` авторов и держит столько же
+    рецептов в избранном и в корзине, остальные пользователи получают по
+    ``RELATIONS_PER_USER`` связей каждого вида.
+    """
+    rand = random.Random(seed)
+    User.objects.bulk_create(
+        User(
+            username=f'user{index}',
+            email=f'user{index}@foodgram.test',
+            first_name=f'Имя{index}',
+            last_name=f'Фамилия{index}',
+            password='!'
+        ) for index in range(USERS_COUNT)
+    )
+    # bulk_create заполняет первичные ключи только на PostgreSQL.
+    users = list(User.objects.order_by('pk'))
+    Tag.objects.bulk_create(
+        Tag(name=f'Тэг {index}', slug=f'tag{index}')
+        for index in range(TAGS_COUNT)
+    )
+    tags = list(Tag.objects.order_by('pk'))
+    Ingredient.objects.bulk_create(
+        Ingredient(name=f'продукт {index:05}', measurement_unit='г')
+        for index in range(INGREDIENTS_COUNT)
+    )
+    ingredient_ids = list(Ingredient.objects.values_list('pk', flat=True))
+    Recipe.objects.bulk_create(
+        Recipe(
+            name=f'Рецепт {index}',
+            text='Описание рецепта ' * 10,
+            cooking_time=rand.randint(1, 120),
+            image='food/images/benchmark.png',
+            author=users[index % len(users)]
+        ) for index in range(RECIPES_COUNT)
+    )
+    recipe_ids = list(Recipe.objects.values_list('pk', flat=True))
+    AmountIngredient.objects.bulk_create(
+        AmountIngredient(
+            recipe_id=recipe_id,
+            ingredient_id=ingredient_id,
+            amount=rand.randint(1, 500)
+        )
+        for recipe_id in recipe_ids
+        for ingredient_id in rand.sample(
+            ingredient_ids, INGREDIENTS_PER_RECIPE
+        )
+    )
+    Recipe.tags.through.objects.bulk_create(
+        Recipe.tags.through(recipe_id=recipe_id, tag_id=tag.pk)
+        for recipe_id in recipe_ids
+        for tag in rand.sample(tags, TAGS_PER_RECIPE)
+    )
+    reader, others = users[0], users[1:]
+    for model in (Favorite, ShoppingCart):
+        model.objects.bulk_create(
+            model(user=user, recipe_id=recipe_id)
+            for user, count in (
+                (reader, READER_RELATIONS),
+                *((user, RELATIONS_PER_USER) for user in others)
+            )
+            for recipe_id in rand.sample(
+                recipe_ids, min(count, len(recipe_ids))
+            )
+        )
+    Subscription.objects.bulk_create(
+        Subscription(user=user, author=author)
+        for user, count in (
+            (reader, READER_RELATIONS),
+            *((user, RELATIONS_PER_USER) for user in others)
+        )
+        for author in rand.sample(
+            [other for other in users if other != user],
+            min(count, len(users) - 1)
+        )
+    )
+    Token.objects.create(user=reader)
+    # bulk_create не отправляет сигналы, поэтому счётчики пересчитываются.
+    call_command('recount', stdout=StringIO())
+    return reader
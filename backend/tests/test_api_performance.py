@@ -0,0 +1,402 @@
+import json
+import os
+import shutil
+import statistics
+import tempfile
+import time
+
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from api.authentication import issue_token
+from food.models import Ingredient, Recipe, Tag
+from food.shortlinks import encode, recipe_ids
+
+from .dataset import SCALE, seed_dataset
+
+REPORT_PATH = os.getenv('BENCHMARK_REPORT')
+REPEATS = int(os.getenv('BENCHMARK_REPEATS', '3'))
+MEDIA_ROOT = tempfile.mkdtemp()
+IMAGE = (
+    'data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAA'
+    'DUlEQVR42mP8z8BQDwAEhQGAhKmMIQAAAABJRU5ErkJggg=='
+)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ApiPerformanceTest(APITestCase):
+    """Число SQL-запросов и время ответа эндпоинтов API.
+
+    Каждый эндпоинт вызывается на синтетическом наборе данных: число
+    запросов не должно превышать заданного бюджета, а время ответа
+    попадает в отчёт, если задана переменная окружения BENCHMARK_REPORT.
+    """
+
+    results = {}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.reader = seed_dataset()
+        cls.token = issue_token(cls.reader)
+        cls.recipe = Recipe.objects.exclude(author=cls.reader).first()
+        cls.own_recipe = Recipe.objects.filter(author=cls.reader).first()
+        cls.author = cls.recipe.author
+        cls.stranger = cls.reader.__class__.objects.exclude(
+            authors__user=cls.reader
+        ).exclude(pk=cls.reader.pk).first()
+        cls.tag = Tag.objects.first()
+        cls.ingredient = Ingredient.objects.first()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        if REPORT_PATH:
+            with open(REPORT_PATH, 'w', encoding='utf-8') as report:
+                json.dump(
+                    {
+                        'database': connection.vendor,
+                        'scale': SCALE,
+                        'repeats': REPEATS,
+                        'endpoints': cls.results,
+                    },
+                    report,
+                    ensure_ascii=False,
+                    indent=2,
+                    sort_keys=True
+                )
+
+    def setUp(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token}')
+
+    def request(self, method, url, data=None, content_type=None):
+        """Выполняет запрос и полностью читает тело ответа."""
+        if content_type is None:
+            response = getattr(self.client, method)(url, data, format='json')
+        else:
+            response = getattr(self.client, method)(
+                url, data, content_type=content_type
+            )
+        if response.streaming:
+            b''.join(response.streaming_content)
+        return response
+
+    def check_endpoint(self, name, url, max_queries, method='get', data=None,
+                       status_code=status.HTTP_200_OK, repeat=True,
+                       content_type=None):
+        """Проверяет бюджет запросов эндпоинта и замеряет время ответа."""
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = self.request(method, url, data, content_type)
+            timings = [time.perf_counter() - started]
+        # Тестовый клиент очищает журнал запросов в начале каждого запроса.
+        sql = [query['sql'] for query in queries.captured_queries]
+        self.assertEqual(response.status_code, status_code, name)
+        for _ in range(REPEATS - 1 if repeat else 0):
+            started = time.perf_counter()
+            self.request(method, url, data, content_type)
+            timings.append(time.perf_counter() - started)
+        self.results[name] = {
+            'method': method.upper(),
+            'url': url,
+            'queries': len(sql),
+            'max_queries': max_queries,
+            'median_ms': round(statistics.median(timings) * 1000, 3),
+            'max_ms': round(max(timings) * 1000, 3),
+        }
+        self.assertLessEqual(
+            len(sql), max_queries,
+            f'{name}: {len(sql)} запросов вместо {max_queries}:\n'
+            + '\n'.join(sql)
+        )
+        return response
+
+    def test_recipes_list(self):
+        self.check_endpoint('recipes_list', '/api/recipes/', 5)
+
+    def test_recipes_list_anonymous(self):
+        self.client.credentials()
+        self.check_endpoint('recipes_list_anonymous', '/api/recipes/', 4)
+
+    def test_recipes_list_large_page(self):
+        self.check_endpoint(
+            'recipes_list_large_page', '/api/recipes/?limit=100', 5
+        )
+
+    def test_recipes_list_deep_page(self):
+        self.check_endpoint(
+            'recipes_list_deep_page', '/api/recipes/?page=100', 5
+        )
+
+    def test_recipes_list_cursor(self):
+        self.check_endpoint(
+            'recipes_list_cursor', '/api/recipes/?cursor=&limit=100', 4
+        )
+
+    def test_recipes_filter_tags(self):
+        self.check_endpoint(
+            'recipes_filter_tags',
+            f'/api/recipes/?tags={self.tag.slug}&tags=tag1', 6
+        )
+
+    def test_recipes_filter_author(self):
+        self.check_endpoint(
+            'recipes_filter_author',
+            f'/api/recipes/?author={self.author.pk}', 6
+        )
+
+    def test_recipes_filter_favorited(self):
+        self.check_endpoint(
+            'recipes_filter_favorited', '/api/recipes/?is_favorited=1', 5
+        )
+
+    def test_recipes_filter_shopping_cart(self):
+        self.check_endpoint(
+            'recipes_filter_shopping_cart',
+            '/api/recipes/?is_in_shopping_cart=1', 5
+        )
+
+    def test_recipes_search(self):
+        self.check_endpoint(
+            'recipes_search', '/api/recipes/?search=Рецепт%2012', 5
+        )
+
+    def test_recipe_detail(self):
+        self.check_endpoint(
+            'recipe_detail', f'/api/recipes/{self.recipe.pk}/', 5
+        )
+
+    def test_recipe_short_link(self):
+        recipe_ids.rebuild()
+        self.check_endpoint(
+            'recipe_short_link', f'/api/recipes/{self.recipe.pk}/get-link/', 0
+        )
+
+    def test_recipe_redirect(self):
+        recipe_ids.rebuild()
+        self.check_endpoint(
+            'recipe_redirect', f'/s/{encode(self.recipe.pk)}/', 0,
+            status_code=status.HTTP_302_FOUND
+        )
+
+    def test_recipe_create(self):
+        self.check_endpoint(
+            'recipe_create', '/api/recipes/', 14, method='post',
+            data={
+                'name': 'Новый рецепт',
+                'text': 'Описание',
+                'cooking_time': 10,
+                'image': IMAGE,
+                'tags': [self.tag.pk],
+                'ingredients': [
+                    {'id': pk, 'amount': 10}
+                    for pk in Ingredient.objects.values_list(
+                        'pk', flat=True
+                    )[:10]
+                ],
+            },
+            status_code=status.HTTP_201_CREATED, repeat=False
+        )
+
+    def test_recipe_update(self):
+        self.check_endpoint(
+            'recipe_update', f'/api/recipes/{self.own_recipe.pk}/', 17,
+            method='patch',
+            data={
+                'name': 'Обновлённый рецепт',
+                'text': 'Описание',
+                'cooking_time': 15,
+                'image': IMAGE,
+                'tags': [self.tag.pk],
+                'ingredients': [
+                    {'id': pk, 'amount': 20}
+                    for pk in Ingredient.objects.values_list(
+                        'pk', flat=True
+                    )[:10]
+                ],
+            }
+        )
+
+    def test_recipe_delete(self):
+        self.check_endpoint(
+            'recipe_delete', f'/api/recipes/{self.own_recipe.pk}/', 13,
+            method='delete', status_code=status.HTTP_204_NO_CONTENT,
+            repeat=False
+        )
+
+    def test_recipes_export(self):
+        self.check_endpoint(
+            'recipes_export', f'/api/recipes/export/?author={self.author.pk}',
+            6
+        )
+
+    def test_recipes_import(self):
+        line = json.dumps({
+            'name': 'Импортированный рецепт',
+            'text': 'Описание',
+            'cooking_time': 10,
+            'image': IMAGE,
+            'tags': [self.tag.slug],
+            'ingredients': [
+                {'id': pk, 'amount': 10}
+                for pk in Ingredient.objects.values_list(
+                    'pk', flat=True
+                )[:10]
+            ],
+        })
+        self.check_endpoint(
+            'recipes_import', '/api/recipes/import/', 9, method='post',
+            data='\n'.join([line] * 10),
+            content_type='application/x-ndjson', repeat=False
+        )
+
+    def test_favorite_add_and_remove(self):
+        recipe = Recipe.objects.exclude(favorites__user=self.reader).first()
+        url = f'/api/recipes/{recipe.pk}/favorite/'
+        self.check_endpoint(
+            'favorite_add', url, 7, method='post',
+            status_code=status.HTTP_201_CREATED, repeat=False
+        )
+        self.check_endpoint(
+            'favorite_remove', url, 5, method='delete',
+            status_code=status.HTTP_204_NO_CONTENT, repeat=False
+        )
+
+    def test_shopping_cart_add_and_remove(self):
+        recipe = Recipe.objects.exclude(
+            shoppingcarts__user=self.reader
+        ).first()
+        url = f'/api/recipes/{recipe.pk}/shopping_cart/'
+        self.check_endpoint(
+            'shopping_cart_add', url, 6, method='post',
+            status_code=status.HTTP_201_CREATED, repeat=False
+        )
+        self.check_endpoint(
+            'shopping_cart_remove', url, 4, method='delete',
+            status_code=status.HTTP_204_NO_CONTENT, repeat=False
+        )
+
+    def test_download_shopping_cart(self):
+        self.check_endpoint(
+            'download_shopping_cart',
+            '/api/recipes/download_shopping_cart/', 3
+        )
+
+    def test_tags_list(self):
+        self.check_endpoint('tags_list', '/api/tags/', 1)
+
+    def test_tag_detail(self):
+        self.check_endpoint('tag_detail', f'/api/tags/{self.tag.pk}/', 1)
+
+    def test_ingredients_list(self):
+        self.check_endpoint('ingredients_list', '/api/ingredients/', 1)
+
+    def test_ingredients_search(self):
+        self.check_endpoint(
+            'ingredients_search', '/api/ingredients/?name=продукт%2000', 1
+        )
+
+    def test_ingredient_detail(self):
+        self.check_endpoint(
+            'ingredient_detail', f'/api/ingredients/{self.ingredient.pk}/', 1
+        )
+
+    def test_users_list(self):
+        self.check_endpoint('users_list', '/api/users/', 4)
+
+    def test_user_detail(self):
+        self.check_endpoint('user_detail', f'/api/users/{self.author.pk}/', 2)
+
+    def test_users_me(self):
+        self.check_endpoint('users_me', '/api/users/me/', 2)
+
+    def test_subscriptions(self):
+        self.check_endpoint(
+            'subscriptions', '/api/users/subscriptions/?recipes_limit=3', 4
+        )
+
+    def test_subscriptions_large_page(self):
+        self.check_endpoint(
+            'subscriptions_large_page',
+            '/api/users/subscriptions/?limit=50&recipes_limit=3', 4
+        )
+
+    def test_subscribe_and_unsubscribe(self):
+        url = f'/api/users/{self.stranger.pk}/subscribe/'
+        self.check_endpoint(
+            'subscribe', url, 10, method='post',
+            status_code=status.HTTP_201_CREATED, repeat=False
+        )
+        self.check_endpoint(
+            'unsubscribe', url, 5, method='delete',
+            status_code=status.HTTP_204_NO_CONTENT, repeat=False
+        )
+
+    def test_avatar_update_and_delete(self):
+        url = '/api/users/me/avatar/'
+        self.check_endpoint(
+            'avatar_update', url, 3, method='put', data={'avatar': IMAGE},
+            repeat=False
+        )
+        self.check_endpoint(
+            'avatar_delete', url, 3, method='delete',
+            status_code=status.HTTP_204_NO_CONTENT, repeat=False
+        )
+
+    def test_user_registration(self):
+        self.client.credentials()
+        self.check_endpoint(
+            'user_registration', '/api/users/', 5, method='post',
+            data={
+                'email': 'new@foodgram.test',
+                'username': 'new_user',
+                'first_name': 'Новый',
+                'last_name': 'Пользователь',
+                'password': 'Secret-password-42',
+            },
+            status_code=status.HTTP_201_CREATED, repeat=False
+        )
+
+    def test_set_password(self):
+        self.reader.set_password('Secret-password-42')
+        self.reader.save()
+        self.check_endpoint(
+            'set_password', '/api/users/set_password/', 3, method='post',
+            data={
+                'current_password': 'Secret-password-42',
+                'new_password': 'Another-password-42',
+            },
+            status_code=status.HTTP_204_NO_CONTENT, repeat=False
+        )
+
+    def test_token_login_and_logout(self):
+        self.reader.set_password('Secret-password-42')
+        self.reader.save()
+        self.client.credentials()
+        response = self.check_endpoint(
+            'token_login', '/api/auth/token/login/', 2, method='post',
+            data={
+                'email': self.reader.email,
+                'password': 'Secret-password-42',
+            },
+            repeat=False
+        )
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Token {response.json()["auth_token"]}'
+        )
+        self.check_endpoint(
+            'token_logout', '/api/auth/token/logout/', 0, method='post',
+            status_code=status.HTTP_204_NO_CONTENT, repeat=False
+        )
+
+    def test_db_pool(self):
+        admin = self.reader.__class__.objects.create(
+            username='admin', email='admin@foodgram.test', is_staff=True
+        )
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Token {issue_token(admin)}'
+        )
+        self.check_endpoint('db_pool', '/api/db-pool/', 1)
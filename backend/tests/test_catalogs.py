@@ -0,0 +1,116 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.backends.filebased import FileBasedCache
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from api.cache import CATALOG_VERSION_KEY, bump_version
+from food.models import Ingredient, Tag
+
+
+class CatalogCacheTest(APITestCase):
+    """Кэш справочников тегов и продуктов."""
+
+    @classmethod
+    def setUpTestData(cls):
+        Tag.objects.create(name='Завтрак', slug='breakfast')
+        Ingredient.objects.create(name='мука', measurement_unit='г')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_not_modified(self):
+        for url in ('/api/tags/', '/api/ingredients/'):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            with self.assertNumQueries(0):
+                response = self.client.get(
+                    url, HTTP_IF_NONE_MATCH=response['ETag']
+                )
+            self.assertEqual(
+                response.status_code, status.HTTP_304_NOT_MODIFIED
+            )
+
+    def test_cached_body_is_reused(self):
+        self.client.get('/api/ingredients/')
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/ingredients/')
+        self.assertEqual(
+            response.json(),
+            [{'id': Ingredient.objects.get().pk, 'name': 'мука',
+              'measurement_unit': 'г'}]
+        )
+
+    def test_changes_invalidate_cache(self):
+        etag = self.client.get('/api/tags/')['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            Tag.objects.create(name='Обед', slug='lunch')
+        response = self.client.get('/api/tags/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(
+            [tag['slug'] for tag in response.json()], ['breakfast', 'lunch']
+        )
+
+    def test_import_in_other_process_invalidates_cache(self):
+        self.client.get('/api/tags/')
+        Tag.objects.create(name='Обед', slug='lunch')
+        # Другой процесс, например import_catalog, со своим подключением к
+        # общему кэшу по умолчанию.
+        bump_version(
+            CATALOG_VERSION_KEY.format('tags'),
+            FileBasedCache(settings.CACHES['default']['LOCATION'], {})
+        )
+        self.assertEqual(
+            [tag['slug'] for tag in self.client.get('/api/tags/').json()],
+            ['breakfast', 'lunch']
+        )
+
+    def test_filtered_list_is_not_cached(self):
+        self.client.get('/api/ingredients/')
+        with self.captureOnCommitCallbacks(execute=False):
+            Ingredient.objects.create(name='мёд', measurement_unit='г')
+        response = self.client.get('/api/ingredients/', {'name': 'мё'})
+        self.assertEqual(
+            [ingredient['name'] for ingredient in response.json()], ['мёд']
+        )
+
+
+class IngredientSearchTest(APITestCase):
+    """Поиск продуктов по названию."""
+
+    @classmethod
+    def setUpTestData(cls):
+        Ingredient.objects.bulk_create(
+            Ingredient(name=name, measurement_unit='г')
+            for name in ('сахарная пудра', 'ванильный сахар', 'сахар', 'соль')
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def search(self, name):
+        response = self.client.get('/api/ingredients/', {'name': name})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [ingredient['name'] for ingredient in response.json()]
+
+    def test_prefix_matches_go_first(self):
+        self.assertEqual(
+            self.search('Сах'),
+            ['сахар', 'сахарная пудра', 'ванильный сахар']
+        )
+
+    def test_no_matches(self):
+        self.assertEqual(self.search('перец'), [])
+
+    def test_index_follows_catalog_changes(self):
+        self.search('со')
+        with self.captureOnCommitCallbacks(execute=True):
+            Ingredient.objects.create(name='соус', measurement_unit='мл')
+        self.assertEqual(self.search('со'), ['соль', 'соус'])
+
+    def test_database_fallback(self):
+        with self.settings(INGREDIENT_SEARCH_INDEX=False):
+            self.assertEqual(
+                self.search('сах'), ['сахар', 'сахарная пудра']
+            )
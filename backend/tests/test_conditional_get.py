@@ -0,0 +1,116 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import override_settings
+from django.utils.http import http_date
+from rest_framework.test import APITestCase
+
+from food.models import Favorite, Recipe, Tag
+
+User = get_user_model()
+
+
+class ConditionalGetTest(APITestCase):
+    """Условные запросы к списку и деталям рецептов."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(
+            username='author', email='author@foodgram.test'
+        )
+        cls.reader = User.objects.create(
+            username='reader', email='reader@foodgram.test'
+        )
+        cls.tag = Tag.objects.create(name='Завтрак', slug='breakfast')
+        cls.recipe = Recipe.objects.create(
+            name='Блины', text='Описание', cooking_time=10,
+            image='food/images/test.png', author=cls.author
+        )
+        cls.recipe.tags.add(cls.tag)
+
+    def setUp(self):
+        caches['responses'].clear()
+
+    def test_matching_etag_skips_serialization(self):
+        url = f'/api/recipes/{self.recipe.pk}/'
+        etag = self.client.get(url)['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_if_modified_since(self):
+        url = f'/api/recipes/{self.recipe.pk}/'
+        response = self.client.get(url)
+        self.assertEqual(
+            self.client.get(
+                url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+            ).status_code,
+            304
+        )
+        self.assertEqual(
+            self.client.get(
+                url, HTTP_IF_MODIFIED_SINCE=http_date(0)
+            ).status_code,
+            200
+        )
+
+    def test_list_changes_after_deletion(self):
+        older = Recipe.objects.create(
+            name='Оладьи', text='Описание', cooking_time=10,
+            image='food/images/test.png', author=self.author
+        )
+        response = self.client.get('/api/recipes/')
+        self.assertFalse(response.has_header('Last-Modified'))
+        older.delete()
+        for headers in (
+            {'HTTP_IF_MODIFIED_SINCE': http_date(time.time() + 60)},
+            {'HTTP_IF_NONE_MATCH': response['ETag']},
+        ):
+            response = self.client.get('/api/recipes/', **headers)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()['count'], 1)
+
+    def test_filters_have_own_etags(self):
+        self.assertNotEqual(
+            self.client.get('/api/recipes/')['ETag'],
+            self.client.get('/api/recipes/?tags=breakfast')['ETag']
+        )
+
+    def test_related_change_changes_etag(self):
+        etag = self.client.get('/api/recipes/')['ETag']
+        self.tag.name = 'Обед'
+        self.tag.save()
+        response = self.client.get('/api/recipes/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json()['results'][0]['tags'][0]['name'], 'Обед'
+        )
+
+    def test_user_flags_change_etag(self):
+        url = f'/api/recipes/{self.recipe.pk}/'
+        self.client.force_authenticate(self.reader)
+        response = self.client.get(url)
+        self.assertFalse(response.has_header('Last-Modified'))
+        Favorite.objects.create(user=self.reader, recipe=self.recipe)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()['is_favorited'])
+
+    def test_missing_recipe(self):
+        self.assertEqual(self.client.get('/api/recipes/0/').status_code, 404)
+
+    def test_non_numeric_pk(self):
+        self.assertEqual(
+            self.client.get('/api/recipes/abc/').status_code, 404
+        )
+
+    @override_settings(RESPONSE_CACHE_TIMEOUT=60)
+    def test_cached_response_answers_not_modified(self):
+        etag = self.client.get('/api/recipes/')['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(
+                '/api/recipes/', HTTP_IF_NONE_MATCH=etag
+            )
+        self.assertEqual(response.status_code, 304)
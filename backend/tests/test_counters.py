@@ -0,0 +1,64 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from food.models import Favorite, Recipe
+
+User = get_user_model()
+
+
+class CountersTest(APITestCase):
+    """Денормализованные счётчики избранного, рецептов и подписчиков."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(
+            username='author', email='author@foodgram.test'
+        )
+        cls.reader = User.objects.create(
+            username='reader', email='reader@foodgram.test'
+        )
+        cls.recipe = Recipe.objects.create(
+            name='Рецепт', text='Описание', cooking_time=10,
+            image='food/images/test.png', author=cls.author
+        )
+
+    def setUp(self):
+        self.client.force_authenticate(self.reader)
+
+    def assertCounter(self, instance, field, expected):
+        instance.refresh_from_db(fields=[field])
+        self.assertEqual(getattr(instance, field), expected)
+
+    def test_recipes_count(self):
+        self.assertCounter(self.author, 'recipes_count', 1)
+        self.recipe.delete()
+        self.assertCounter(self.author, 'recipes_count', 0)
+
+    def test_favorites_count(self):
+        url = f'/api/recipes/{self.recipe.pk}/favorite/'
+        self.client.post(url)
+        self.assertCounter(self.recipe, 'favorites_count', 1)
+        self.client.delete(url)
+        self.assertCounter(self.recipe, 'favorites_count', 0)
+
+    def test_subscribers_count(self):
+        url = f'/api/users/{self.author.pk}/subscribe/'
+        response = self.client.post(url)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertCounter(self.author, 'subscribers_count', 1)
+        self.client.delete(url)
+        self.assertCounter(self.author, 'subscribers_count', 0)
+
+    def test_recount_repairs_drift(self):
+        Favorite.objects.bulk_create([
+            Favorite(user=self.reader, recipe=self.recipe),
+            Favorite(user=self.author, recipe=self.recipe),
+        ])
+        User.objects.filter(pk=self.author.pk).update(recipes_count=7)
+        call_command('recount', stdout=StringIO())
+        self.assertCounter(self.recipe, 'favorites_count', 2)
+        self.assertCounter(self.author, 'recipes_count', 1)
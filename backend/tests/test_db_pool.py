@@ -0,0 +1,85 @@
+import sqlite3
+import threading
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db.utils import OperationalError
+from django.test import SimpleTestCase
+from rest_framework.test import APITestCase
+
+from foodgram_backend.db.pool import ConnectionPool, get_pool
+
+User = get_user_model()
+
+
+class ConnectionPoolTest(SimpleTestCase):
+    """Пул соединений: повторное использование, ожидание и проверки."""
+
+    def make_pool(self, **kwargs):
+        return ConnectionPool(lambda: sqlite3.connect(
+            ':memory:', check_same_thread=False
+        ), **kwargs)
+
+    def test_released_connection_is_reused(self):
+        pool = self.make_pool()
+        connection = pool.acquire()
+        pool.release(connection)
+        self.assertIs(pool.acquire(), connection)
+        self.assertEqual(pool.stats()['connects'], 1)
+        self.assertEqual(pool.stats()['in_use'], 1)
+
+    def test_waits_for_free_connection(self):
+        pool = self.make_pool(max_size=1, timeout=5)
+        connection = pool.acquire()
+        timer = threading.Timer(0.05, pool.release, (connection,))
+        timer.start()
+        self.assertIs(pool.acquire(), connection)
+        timer.join()
+        self.assertEqual(pool.stats()['waits'], 1)
+
+    def test_timeout_when_exhausted(self):
+        pool = self.make_pool(max_size=1, timeout=0.01)
+        pool.acquire()
+        with self.assertRaises(OperationalError):
+            pool.acquire()
+        self.assertEqual(pool.stats()['timeouts'], 1)
+
+    def test_broken_idle_connection_is_replaced(self):
+        pool = self.make_pool(check_interval=0, check=lambda connection: (
+            connection.execute('SELECT 1') and True
+        ))
+        connection = pool.acquire()
+        pool.release(connection)
+        connection.close()
+        self.assertIsNot(pool.acquire(), connection)
+        self.assertEqual(pool.stats()['reconnects'], 1)
+        self.assertEqual(pool.stats()['size'], 1)
+
+    def test_failed_reset_discards_connection(self):
+        pool = self.make_pool()
+        connection = pool.acquire()
+        connection.close()
+        pool.release(connection)
+        self.assertEqual(pool.stats()['size'], 0)
+
+    def test_idle_connections_expire(self):
+        pool = self.make_pool(max_idle=0)
+        pool.release(pool.acquire())
+        pool.acquire()
+        self.assertEqual(pool.stats()['expired'], 1)
+        self.assertEqual(pool.stats()['size'], 1)
+
+
+class DatabasePoolViewTest(APITestCase):
+    """Статистика пулов доступна только администраторам."""
+
+    def test_stats(self):
+        admin = User.objects.create(
+            username='admin', email='admin@foodgram.test', is_staff=True
+        )
+        self.assertEqual(self.client.get('/api/db-pool/').status_code, 401)
+        self.client.force_authenticate(admin)
+        with mock.patch.dict('foodgram_backend.db.pool._pools', clear=True):
+            get_pool('default', connect=lambda: sqlite3.connect(':memory:'))
+            response = self.client.get('/api/db-pool/')
+        self.assertEqual(response.json()['pools']['default']['in_use'], 0)
@@ -0,0 +1,23 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from .dataset import seed_dataset
+
+
+class ExplainQueriesCommandTest(TestCase):
+    """Команда explain_queries."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.reader = seed_dataset()
+
+    def test_reports_every_query(self):
+        out = StringIO()
+        call_command(
+            'explain_queries', user=self.reader.pk, verbose_plans=True,
+            stdout=out
+        )
+        for name in ('recipes_feed', 'subscriptions', 'shopping_list'):
+            self.assertIn(name, out.getvalue())
@@ -0,0 +1,73 @@
+import io
+import json
+import os
+import tempfile
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from food.importers import read_json_array
+from food.models import Ingredient, Tag
+
+
+class ImportCatalogTest(TestCase):
+    """Потоковый импорт справочников из CSV, JSON и NDJSON."""
+
+    def import_catalog(self, catalog, content, suffix, *args):
+        with tempfile.NamedTemporaryFile(
+            'w', suffix=suffix, encoding='utf-8', delete=False
+        ) as file:
+            file.write(content)
+        self.addCleanup(os.remove, file.name)
+        stdout = io.StringIO()
+        call_command(
+            'import_catalog', catalog, file.name, *args, stdout=stdout
+        )
+        return stdout.getvalue()
+
+    def test_csv(self):
+        Ingredient.objects.create(name='соль', measurement_unit='г')
+        output = self.import_catalog(
+            'ingredients',
+            'name,measurement_unit\nсоль,г\nсахар, г\nмука,кг\n,г\nмёд\n',
+            '.csv', '--chunk-size', '2'
+        )
+        self.assertEqual(
+            set(Ingredient.objects.values_list('name', 'measurement_unit')),
+            {('соль', 'г'), ('сахар', 'г'), ('мука', 'кг')}
+        )
+        self.assertIn(
+            'прочитано 5, добавлено 2, пропущено некорректных 2', output
+        )
+
+    def test_json_array_is_streamed(self):
+        tags = [
+            {'name': f'Тэг {number}', 'slug': f'tag-{number}'}
+            for number in range(20)
+        ]
+        content = json.dumps(tags, ensure_ascii=False, indent=2)
+        with mock.patch('food.importers.JSON_READ_SIZE', 7):
+            self.assertEqual(
+                list(read_json_array(io.StringIO(content))), tags
+            )
+            self.import_catalog('tags', content, '.json', '--chunk-size', '3')
+        self.assertEqual(Tag.objects.count(), 20)
+
+    def test_ndjson(self):
+        self.import_catalog(
+            'tags',
+            '{"name": "Обед", "slug": "lunch"}\n\n'
+            '{"name": "Ужин", "slug": "dinner"}\n',
+            '.txt', '--format', 'ndjson'
+        )
+        self.assertEqual(
+            sorted(Tag.objects.values_list('slug', flat=True)),
+            ['dinner', 'lunch']
+        )
+
+    def test_broken_json(self):
+        with self.assertRaises(CommandError):
+            self.import_catalog('tags', '[{"name": "Обед"', '.json')
+        with self.assertRaises(CommandError):
+            self.import_catalog('tags', '[]', '.xml')
@@ -0,0 +1,110 @@
+import os
+import shutil
+import tempfile
+import time
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from food.models import Recipe
+from food.renditions import rendition_name
+
+from .test_uploads import png
+
+User = get_user_model()
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class MediaStorageTest(TestCase):
+    """Хранение изображений по хэшу содержимого и удаление лишних файлов."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(
+            username='author', email='author@foodgram.test'
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def create_recipe(self, content):
+        recipe = Recipe(
+            name='Рецепт', text='Описание', cooking_time=10,
+            author=self.author
+        )
+        recipe.image.save('upload.png', ContentFile(content), save=False)
+        recipe.save()
+        return recipe
+
+    def age(self, name, seconds=7200):
+        timestamp = time.time() - seconds
+        os.utime(default_storage.path(name), (timestamp, timestamp))
+
+    def test_identical_uploads_share_a_file(self):
+        first = self.create_recipe(png())
+        second = self.create_recipe(png())
+        other = self.create_recipe(png(4, 4))
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertNotEqual(first.image.name, other.image.name)
+
+    def test_file_is_removed_with_last_reference(self):
+        first = self.create_recipe(png())
+        second = self.create_recipe(png())
+        name = first.image.name
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertTrue(default_storage.exists(name))
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertFalse(default_storage.exists(name))
+
+    def test_gc_media(self):
+        kept = self.create_recipe(png()).image.name
+        orphan = default_storage.save('food/images/orphan.png', ContentFile(
+            png(3, 3)
+        ))
+        young = default_storage.save('users/young.png', ContentFile(
+            png(5, 5)
+        ))
+        self.age(kept)
+        self.age(orphan)
+        call_command('gc_media', '--dry-run', stdout=StringIO())
+        self.assertTrue(default_storage.exists(orphan))
+        call_command('gc_media', '--batch-size', '1', stdout=StringIO())
+        self.assertTrue(default_storage.exists(kept))
+        self.assertTrue(default_storage.exists(young))
+        self.assertFalse(default_storage.exists(orphan))
+
+    def test_gc_media_renditions(self):
+        recipe = self.create_recipe(png())
+        kept = default_storage.save_as(
+            rendition_name(recipe.image.name, 'card'), ContentFile(b'card')
+        )
+        orphan = default_storage.save_as(
+            rendition_name('food/images/ab/orphan.png', 'card'),
+            ContentFile(b'card')
+        )
+        legacy = default_storage.save_as(
+            'food/images/renditions/ab/legacy.webp', ContentFile(b'card')
+        )
+        stale = default_storage.save_as(
+            'food/images/renditions/ab/stale.webp', ContentFile(b'card')
+        )
+        Recipe.objects.filter(pk=recipe.pk).update(image_renditions={
+            'source': recipe.image.name, 'thumbnail': legacy
+        })
+        for name in (recipe.image.name, kept, orphan, legacy, stale):
+            self.age(name)
+        call_command('gc_media', stdout=StringIO())
+        self.assertTrue(default_storage.exists(recipe.image.name))
+        self.assertTrue(default_storage.exists(kept))
+        self.assertTrue(default_storage.exists(legacy))
+        self.assertFalse(default_storage.exists(orphan))
+        self.assertFalse(default_storage.exists(stale))
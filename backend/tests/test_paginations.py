@@ -0,0 +1,81 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from food.models import Recipe, Subscription
+
+User = get_user_model()
+
+
+class CursorPaginationTest(APITestCase):
+    """Вывод рецептов и подписок по курсору."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(
+            username='reader', email='reader@foodgram.test'
+        )
+        Recipe.objects.bulk_create(
+            Recipe(
+                name=f'Рецепт {index}', text='Описание', cooking_time=10,
+                image='food/images/test.png', author=cls.user
+            ) for index in range(7)
+        )
+        # Два рецепта с одинаковым временем публикации проверяют ключ id.
+        now = timezone.now()
+        for index, recipe in enumerate(Recipe.objects.order_by('pk')):
+            recipe.pub_date = now - timedelta(minutes=index // 2)
+            recipe.save(update_fields=['pub_date'])
+        Subscription.objects.bulk_create(
+            Subscription(user=cls.user, author=User.objects.create(
+                username=f'author{index}',
+                email=f'author{index}@foodgram.test'
+            )) for index in range(5)
+        )
+
+    def walk(self, url):
+        """Проходит все страницы по ссылкам next."""
+        pages = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn('count', response.data)
+            pages.append(response.data['results'])
+            url = response.data['next']
+        return pages
+
+    def test_recipes_by_cursor(self):
+        pages = self.walk('/api/recipes/?cursor=&limit=3')
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+        self.assertEqual(
+            [recipe['id'] for page in pages for recipe in page],
+            list(
+                Recipe.objects.order_by('-pub_date', '-id').values_list(
+                    'id', flat=True
+                )
+            )
+        )
+
+    def test_cursor_page_skips_count_query(self):
+        with self.assertNumQueries(3):
+            self.client.get('/api/recipes/?cursor=&limit=3')
+
+    def test_page_number_contract_is_kept(self):
+        response = self.client.get('/api/recipes/?page=2&limit=3')
+        self.assertEqual(response.data['count'], 7)
+        self.assertEqual(len(response.data['results']), 3)
+
+    def test_subscriptions_by_cursor(self):
+        self.client.force_authenticate(self.user)
+        pages = self.walk('/api/users/subscriptions/?cursor=&limit=2')
+        self.assertEqual(
+            [author['username'] for page in pages for author in page],
+            [f'author{index}' for index in range(5)]
+        )
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/api/recipes/?cursor=garbage')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
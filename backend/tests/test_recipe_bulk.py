@@ -0,0 +1,170 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from food.bulk import RecipeImporter
+from food.models import AmountIngredient, Ingredient, Recipe, Tag
+from food.shortlinks import recipe_ids
+
+from .test_api_performance import IMAGE
+
+User = get_user_model()
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, IMAGE_RENDITIONS_ASYNC=False)
+class RecipeBulkTest(APITestCase):
+    """Массовый импорт и выгрузка рецептов в NDJSON."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(
+            username='author', email='author@foodgram.test'
+        )
+        cls.ingredients = [
+            Ingredient.objects.create(
+                name=f'продукт {number}', measurement_unit='г'
+            ) for number in range(3)
+        ]
+        cls.tags = [
+            Tag.objects.create(name=f'тэг {number}', slug=f'tag{number}')
+            for number in range(2)
+        ]
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.client.force_authenticate(self.author)
+
+    def recipe(self, name, **fields):
+        return {
+            'name': name,
+            'text': 'Описание',
+            'cooking_time': 10,
+            'image': IMAGE,
+            'tags': [self.tags[0].pk, 'tag1'],
+            'ingredients': [
+                {'id': self.ingredients[0].pk, 'amount': 100},
+                {
+                    'name': 'продукт 1', 'measurement_unit': 'г',
+                    'amount': 5
+                },
+            ],
+            **fields,
+        }
+
+    def import_lines(self, lines):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.generic(
+                'POST', '/api/recipes/import/', '\n'.join(lines),
+                content_type='application/x-ndjson'
+            )
+            self.assertEqual(response.status_code, 200)
+            return [
+                json.loads(line)
+                for line in b''.join(response.streaming_content).splitlines()
+            ]
+
+    def test_import(self):
+        results = self.import_lines([
+            json.dumps(self.recipe('Первый')),
+            '',
+            '{"name": ',
+            json.dumps(self.recipe('Без продукта', ingredients=[
+                {'name': 'нет', 'measurement_unit': 'г', 'amount': 1}
+            ])),
+            json.dumps(self.recipe('Второй', tags=['tag1'])),
+        ])
+        self.assertEqual([result['line'] for result in results], [1, 3, 4, 5])
+        self.assertIn('errors', results[1])
+        self.assertEqual(
+            results[2]['errors'], {'ingredients': ['Не найдены: нет г']}
+        )
+        first = Recipe.objects.get(pk=results[0]['id'])
+        self.assertEqual(first.name, 'Первый')
+        self.assertEqual(first.author, self.author)
+        self.assertTrue(first.image.name.startswith('food/images/'))
+        self.assertIn('thumbnail', first.image_renditions)
+        self.assertEqual(
+            set(first.amounts.values_list('ingredient', 'amount')),
+            {(self.ingredients[0].pk, 100), (self.ingredients[1].pk, 5)}
+        )
+        self.assertEqual(set(first.tags.all()), set(self.tags))
+        self.assertEqual(
+            list(Recipe.objects.get(pk=results[3]['id']).tags.all()),
+            [self.tags[1]]
+        )
+        self.author.refresh_from_db()
+        self.assertEqual(self.author.recipes_count, 2)
+        self.assertIn(first.pk, recipe_ids)
+
+    def test_chunk_queries_do_not_grow(self):
+        importer = RecipeImporter(self.author.pk, chunk_size=100)
+
+        def count_queries(number):
+            lines = [
+                json.dumps(self.recipe(f'Рецепт {index}', image=IMAGE))
+                for index in range(number)
+            ]
+            with CaptureQueriesContext(connection) as context:
+                results = list(importer.run(lines))
+            self.assertTrue(all('id' in result for result in results))
+            return len(context)
+
+        self.assertEqual(count_queries(2), count_queries(6))
+
+    def test_export_round_trip(self):
+        results = self.import_lines([
+            json.dumps(self.recipe(f'Рецепт {index}')) for index in range(3)
+        ])
+        response = self.client.get('/api/recipes/export/')
+        self.assertEqual(response['Content-Type'], (
+            'application/x-ndjson; charset=utf-8'
+        ))
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        exported = [json.loads(line) for line in lines]
+        self.assertEqual(
+            [recipe['id'] for recipe in exported],
+            [result['id'] for result in results]
+        )
+        self.assertEqual(exported[0]['tags'], ['tag0', 'tag1'])
+        other = User.objects.create(
+            username='other', email='other@foodgram.test'
+        )
+        with tempfile.NamedTemporaryFile(
+            'w', suffix='.ndjson', encoding='utf-8', delete=False
+        ) as file:
+            file.write('\n'.join(lines))
+        self.addCleanup(os.remove, file.name)
+        stdout = io.StringIO()
+        call_command(
+            'import_recipes', file.name, '--author', 'other',
+            '--chunk-size', '2', stdout=stdout
+        )
+        self.assertIn('добавлено 3, с ошибками 0', stdout.getvalue())
+        copies = Recipe.objects.filter(author=other)
+        self.assertEqual(
+            set(copies.values_list('image', flat=True)),
+            {recipe['image'] for recipe in exported}
+        )
+        self.assertEqual(
+            AmountIngredient.objects.filter(recipe__author=other).count(), 6
+        )
+
+    def test_requires_authentication(self):
+        self.client.force_authenticate(None)
+        self.assertEqual(
+            self.client.get('/api/recipes/export/').status_code, 401
+        )
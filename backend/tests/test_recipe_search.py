@@ -0,0 +1,51 @@
+from django.contrib.auth import get_user_model
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from food.models import AmountIngredient, Ingredient, Recipe
+
+User = get_user_model()
+
+
+class RecipeSearchTest(APITestCase):
+    """Поиск рецептов параметром search."""
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create(
+            username='author', email='author@foodgram.test'
+        )
+        cheese = Ingredient.objects.create(
+            name='cheese', measurement_unit='г'
+        )
+        for name, text, ingredients in (
+            ('Pancakes', 'Thin pancakes with cheese filling', [cheese]),
+            ('Cheesecake', 'Classic dessert', []),
+            ('Pasta', 'Served with parmesan', [cheese]),
+            ('Soup', 'Vegetable soup', []),
+        ):
+            recipe = Recipe.objects.create(
+                name=name, text=text, cooking_time=10,
+                image='food/images/test.png', author=author
+            )
+            AmountIngredient.objects.bulk_create(
+                AmountIngredient(
+                    recipe=recipe, ingredient=ingredient, amount=100
+                ) for ingredient in ingredients
+            )
+
+    def search(self, query):
+        response = self.client.get('/api/recipes/', {'search': query})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [recipe['name'] for recipe in response.data['results']]
+
+    def test_name_matches_rank_first(self):
+        self.assertEqual(
+            self.search('cheese'), ['Cheesecake', 'Pasta', 'Pancakes']
+        )
+
+    def test_text_match(self):
+        self.assertEqual(self.search('vegetable'), ['Soup'])
+
+    def test_no_matches(self):
+        self.assertEqual(self.search('chocolate'), [])
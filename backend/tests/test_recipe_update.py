@@ -0,0 +1,178 @@
+import shutil
+import tempfile
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase, APITransactionTestCase
+
+from food.models import (
+    AmountIngredient,
+    Ingredient,
+    Recipe,
+    RecipeQuerySet,
+    Tag
+)
+
+from .test_api_performance import IMAGE
+
+User = get_user_model()
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class RecipeUpdateTest(APITestCase):
+    """Изменение продуктов и тэгов рецепта."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(
+            username='author', email='author@foodgram.test'
+        )
+        cls.ingredients = [
+            Ingredient.objects.create(
+                name=f'продукт {number}', measurement_unit='г'
+            ) for number in range(4)
+        ]
+        cls.tags = [
+            Tag.objects.create(name=f'тэг {number}', slug=f'tag{number}')
+            for number in range(3)
+        ]
+        cls.recipe = Recipe.objects.create(
+            name='Рецепт', text='Описание', cooking_time=10,
+            image='food/images/test.png', author=cls.author
+        )
+        AmountIngredient.objects.bulk_create(
+            AmountIngredient(
+                recipe=cls.recipe, ingredient=ingredient, amount=100
+            ) for ingredient in cls.ingredients[:3]
+        )
+        cls.recipe.tags.set(cls.tags[:2])
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.client.force_authenticate(self.author)
+        self.url = f'/api/recipes/{self.recipe.pk}/'
+
+    def send(self, ingredients, tags):
+        return self.client.patch(
+            self.url,
+            {
+                'name': 'Рецепт',
+                'text': 'Описание',
+                'cooking_time': 10,
+                'image': IMAGE,
+                'ingredients': ingredients,
+                'tags': tags,
+            },
+            format='json'
+        )
+
+    def patch(self, amounts, tags):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.send(
+                [
+                    {'id': self.ingredients[index].pk, 'amount': amount}
+                    for index, amount in amounts.items()
+                ],
+                [self.tags[index].pk for index in tags]
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [query['sql'] for query in queries.captured_queries]
+
+    def amounts(self):
+        return dict(
+            self.recipe.amounts.values_list('ingredient', 'id')
+        )
+
+    def test_only_changes_are_written(self):
+        before = self.amounts()
+        self.patch({0: 100, 1: 50, 3: 10}, tags=(1, 2))
+        after = self.amounts()
+        ingredients = [ingredient.pk for ingredient in self.ingredients]
+        self.assertEqual(after[ingredients[0]], before[ingredients[0]])
+        self.assertEqual(after[ingredients[1]], before[ingredients[1]])
+        self.assertNotIn(ingredients[2], after)
+        self.assertEqual(
+            dict(self.recipe.amounts.values_list('ingredient', 'amount')),
+            {ingredients[0]: 100, ingredients[1]: 50, ingredients[3]: 10}
+        )
+        self.assertEqual(
+            set(self.recipe.tags.all()), {self.tags[1], self.tags[2]}
+        )
+
+    def test_unchanged_relations_are_not_touched(self):
+        sql = self.patch({0: 100, 1: 100, 2: 100}, tags=(0, 1))
+        self.assertFalse([
+            query for query in sql
+            if query.startswith(('INSERT', 'DELETE'))
+            or query.startswith('UPDATE "food_amountingredient"')
+        ])
+
+    def test_missing_ids_are_reported_together(self):
+        response = self.send(
+            [
+                {'id': self.ingredients[0].pk, 'amount': 10},
+                {'id': 1001, 'amount': 10},
+                {'id': 1002, 'amount': 10},
+            ],
+            [self.tags[0].pk, 2001]
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data,
+            {
+                'ingredients': ['Не найдены id: 1001, 1002'],
+                'tags': ['Не найдены id: 2001'],
+            }
+        )
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, IMAGE_RENDITIONS_ASYNC=False)
+class SearchVectorUpdateTest(APITransactionTestCase):
+    """Пересчёт поискового вектора после фиксации изменения рецепта."""
+
+    def test_search_vector_is_rebuilt_once(self):
+        author = User.objects.create(
+            username='author', email='author@foodgram.test'
+        )
+        ingredients = [
+            Ingredient.objects.create(
+                name=f'продукт {number}', measurement_unit='г'
+            ) for number in range(20)
+        ]
+        tag = Tag.objects.create(name='тэг', slug='tag')
+        recipe = Recipe.objects.create(
+            name='Рецепт', text='Описание', cooking_time=10, author=author
+        )
+        AmountIngredient.objects.bulk_create(
+            AmountIngredient(recipe=recipe, ingredient=ingredient, amount=1)
+            for ingredient in ingredients[1:]
+        )
+        self.client.force_authenticate(author)
+        with mock.patch.object(
+            RecipeQuerySet, 'update_search_vector', autospec=True
+        ) as update:
+            response = self.client.patch(
+                f'/api/recipes/{recipe.pk}/',
+                {
+                    'ingredients': [
+                        {'id': ingredients[0].pk, 'amount': 10}
+                    ],
+                    'tags': [tag.pk],
+                },
+                format='json'
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        update.assert_called_once()
+        self.assertEqual(
+            list(update.call_args.args[0].values_list('pk', flat=True)),
+            [recipe.pk]
+        )
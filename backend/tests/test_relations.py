@@ -0,0 +1,80 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from food.models import Favorite, Recipe, ShoppingCart, Subscription
+
+User = get_user_model()
+
+
+class UserRelationsTest(APITestCase):
+    """Отметки избранного, корзины и подписки в ответах API."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(
+            username='reader', email='reader@foodgram.test'
+        )
+        cls.author = User.objects.create(
+            username='author', email='author@foodgram.test'
+        )
+        cls.recipes = [
+            Recipe.objects.create(
+                name=f'Рецепт {number}', text='Описание', cooking_time=10,
+                image='food/images/test.png', author=cls.author
+            ) for number in range(3)
+        ]
+        Favorite.objects.create(user=cls.user, recipe=cls.recipes[0])
+        ShoppingCart.objects.create(user=cls.user, recipe=cls.recipes[1])
+        Subscription.objects.create(user=cls.user, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(self.user)
+
+    def flags(self):
+        return {
+            recipe['id']: (
+                recipe['is_favorited'],
+                recipe['is_in_shopping_cart'],
+                recipe['author']['is_subscribed'],
+            )
+            for recipe in self.client.get('/api/recipes/').data['results']
+        }
+
+    def test_flags(self):
+        self.assertEqual(
+            self.flags(),
+            {
+                self.recipes[0].pk: (True, False, True),
+                self.recipes[1].pk: (False, True, True),
+                self.recipes[2].pk: (False, False, True),
+            }
+        )
+
+    def test_anonymous_flags(self):
+        self.client.force_authenticate(None)
+        self.assertEqual(
+            set(self.flags().values()), {(False, False, False)}
+        )
+
+    def test_user_detail(self):
+        response = self.client.get(f'/api/users/{self.author.pk}/')
+        self.assertTrue(response.data['is_subscribed'])
+
+    @override_settings(RELATIONS_CACHE_TIMEOUT=60)
+    def test_cached_between_requests(self):
+        self.flags()
+        with self.assertNumQueries(4):
+            self.flags()
+
+    @override_settings(RELATIONS_CACHE_TIMEOUT=60)
+    def test_cache_is_invalidated(self):
+        self.flags()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f'/api/recipes/{self.recipes[2].pk}/favorite/')
+            self.client.delete(f'/api/users/{self.author.pk}/subscribe/')
+        self.assertEqual(
+            self.flags()[self.recipes[2].pk], (True, False, False)
+        )
@@ -0,0 +1,154 @@
+import base64
+import shutil
+import tempfile
+from io import BytesIO
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import override_settings
+from PIL import Image
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from food.constants import IMAGE_RENDITIONS
+from food.renditions import rendition_name
+from food.models import Ingredient, Recipe, Tag
+
+User = get_user_model()
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def make_image(width, height):
+    buffer = BytesIO()
+    Image.new('RGB', (width, height), 'orange').save(buffer, 'PNG')
+    return 'data:image/png;base64,' + base64.b64encode(
+        buffer.getvalue()
+    ).decode()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, IMAGE_RENDITIONS_ASYNC=False)
+class RenditionsTest(APITestCase):
+    """Уменьшенные копии изображений рецептов и аватаров."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(
+            username='cook', email='cook@foodgram.test'
+        )
+        cls.ingredient = Ingredient.objects.create(
+            name='мука', measurement_unit='г'
+        )
+        cls.tag = Tag.objects.create(name='Завтрак', slug='breakfast')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def create_recipe(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                '/api/recipes/',
+                {
+                    'name': 'Блины',
+                    'text': 'Описание',
+                    'cooking_time': 10,
+                    'image': make_image(2000, 1000),
+                    'tags': [self.tag.pk],
+                    'ingredients': [{'id': self.ingredient.pk, 'amount': 1}],
+                },
+                format='json'
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return Recipe.objects.get(pk=response.data['id'])
+
+    def test_renditions_are_built(self):
+        recipe = self.create_recipe()
+        self.assertEqual(recipe.image_renditions['source'], recipe.image.name)
+        for rendition, size in IMAGE_RENDITIONS.items():
+            with default_storage.open(
+                recipe.image_renditions[rendition]
+            ) as file, Image.open(file) as image:
+                self.assertEqual(image.format, 'WEBP')
+                self.assertEqual(image.size, (size, size // 2))
+
+    def test_rendition_urls(self):
+        recipe = self.create_recipe()
+        response = self.client.get(f'/api/recipes/{recipe.pk}/')
+        self.assertEqual(
+            set(response.data['image_renditions']), set(IMAGE_RENDITIONS)
+        )
+        self.assertTrue(
+            response.data['image_renditions']['card'].endswith(
+                recipe.image_renditions['card']
+            )
+        )
+        response = self.client.post(f'/api/recipes/{recipe.pk}/favorite/')
+        self.assertTrue(
+            response.data['image'].endswith(
+                recipe.image_renditions['thumbnail']
+            )
+        )
+
+    def test_original_is_served_until_renditions_are_ready(self):
+        recipe = self.create_recipe()
+        Recipe.objects.filter(pk=recipe.pk).update(image_renditions={})
+        response = self.client.get(f'/api/recipes/{recipe.pk}/')
+        self.assertEqual(
+            set(response.data['image_renditions'].values()),
+            {response.data['image']}
+        )
+
+    def test_avatar_renditions(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.put(
+                '/api/users/me/avatar/',
+                {'avatar': make_image(400, 400)},
+                format='json'
+            )
+        response = self.client.get(f'/api/users/{self.user.pk}/')
+        self.assertTrue(
+            response.data['avatar_renditions']['thumbnail'].endswith(
+                User.objects.get(pk=self.user.pk).avatar_renditions[
+                    'thumbnail'
+                ]
+            )
+        )
+
+    def test_identical_renditions_are_not_shared(self):
+        names = []
+        for level in (1, 9):
+            buffer = BytesIO()
+            Image.new('RGB', (800, 400), 'orange').save(
+                buffer, 'PNG', compress_level=level
+            )
+            names.append(default_storage.save(
+                'food/images/source.png', ContentFile(buffer.getvalue())
+            ))
+        self.assertNotEqual(*names)
+        with self.captureOnCommitCallbacks(execute=True):
+            first, second = (
+                Recipe.objects.create(
+                    name='Блины', text='Описание', cooking_time=10,
+                    image=name, author=self.user
+                ) for name in names
+            )
+        first.refresh_from_db()
+        second.refresh_from_db()
+        for recipe in (first, second):
+            for rendition in IMAGE_RENDITIONS:
+                self.assertEqual(
+                    recipe.image_renditions[rendition],
+                    rendition_name(recipe.image.name, rendition)
+                )
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertFalse(default_storage.exists(
+            first.image_renditions['card']
+        ))
+        for path in second.image_renditions.values():
+            self.assertTrue(default_storage.exists(path))
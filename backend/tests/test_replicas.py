@@ -0,0 +1,79 @@
+import random
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from food.models import Recipe
+from foodgram_backend.db.routers import (
+    ReplicaRouter,
+    pin_to_primary,
+    primary,
+    replica_reads
+)
+
+User = get_user_model()
+
+
+@override_settings(DATABASE_REPLICAS=['default'])
+class ReplicaRouterTest(APITestCase):
+    """Чтение из реплик и закрепление за основной базой после записи.
+
+    Роль реплики играет основная база, поэтому выбор реплики виден только
+    по вызову random.choice.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(
+            username='reader', email='reader@foodgram.test'
+        )
+        cls.recipe = Recipe.objects.create(
+            name='Блины', text='Описание', cooking_time=10,
+            author=cls.user
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(self.user)
+
+    def reads_replica(self, method, url):
+        with mock.patch(
+            'foodgram_backend.db.routers.random.choice', wraps=random.choice
+        ) as choice:
+            getattr(self.client, method)(url)
+        return choice.called
+
+    def test_router(self):
+        router = ReplicaRouter()
+        with override_settings(DATABASE_REPLICAS=['replica']):
+            self.assertEqual(router.db_for_read(Recipe), 'default')
+            with replica_reads():
+                self.assertEqual(router.db_for_read(Recipe), 'replica')
+                self.assertEqual(router.db_for_write(Recipe), 'default')
+                with primary():
+                    self.assertEqual(router.db_for_read(Recipe), 'default')
+            self.assertFalse(router.allow_migrate('replica', 'food'))
+            self.assertTrue(router.allow_migrate('default', 'food'))
+
+    def test_safe_requests_read_replicas(self):
+        self.assertTrue(self.reads_replica('get', '/api/recipes/'))
+        self.assertTrue(self.reads_replica('get', '/api/users/'))
+        self.assertFalse(
+            self.reads_replica('get', f'/s/{self.recipe.pk}/')
+        )
+
+    def test_write_pins_user_to_primary(self):
+        self.assertFalse(self.reads_replica(
+            'post', f'/api/recipes/{self.recipe.pk}/favorite/'
+        ))
+        self.assertFalse(self.reads_replica('get', '/api/recipes/'))
+        self.client.force_authenticate(None)
+        self.assertTrue(self.reads_replica('get', '/api/recipes/'))
+
+    def test_pin_expires(self):
+        with override_settings(REPLICA_PIN_TIMEOUT=-1):
+            pin_to_primary(self.user.pk)
+        self.assertTrue(self.reads_replica('get', '/api/recipes/'))
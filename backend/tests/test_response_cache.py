@@ -0,0 +1,85 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from api.cache import RECIPES_GENERATION_KEY, get_version
+from food.models import Recipe, Tag
+
+User = get_user_model()
+
+
+@override_settings(RESPONSE_CACHE_TIMEOUT=60)
+class ResponseCacheTest(APITestCase):
+    """Кэш ответов со списком и деталями рецептов для анонимных."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(
+            username='author', email='author@foodgram.test'
+        )
+        cls.tag = Tag.objects.create(name='Завтрак', slug='breakfast')
+        cls.recipe = Recipe.objects.create(
+            name='Блины', text='Описание', cooking_time=10,
+            image='food/images/test.png', author=cls.author
+        )
+        cls.recipe.tags.add(cls.tag)
+
+    def setUp(self):
+        caches['responses'].clear()
+
+    def test_repeated_request_is_served_from_cache(self):
+        first = self.client.get('/api/recipes/?tags=breakfast&limit=5')
+        with self.assertNumQueries(0):
+            second = self.client.get('/api/recipes/?limit=5&tags=breakfast')
+        self.assertEqual(second.json(), first.json())
+
+    def test_detail_is_cached(self):
+        url = f'/api/recipes/{self.recipe.pk}/'
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url).json()['name'], 'Блины')
+
+    def test_unknown_params_share_the_entry(self):
+        self.client.get('/api/recipes/')
+        with self.assertNumQueries(0):
+            self.client.get('/api/recipes/?utm_source=mail')
+
+    def test_change_invalidates_cache(self):
+        self.client.get('/api/recipes/')
+        self.tag.name = 'Обед'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tag.save()
+        response = self.client.get('/api/recipes/')
+        self.assertEqual(
+            response.json()['results'][0]['tags'][0]['name'], 'Обед'
+        )
+
+    def test_login_keeps_cache(self):
+        self.author.set_password('password')
+        self.author.save()
+        generation = get_version(RECIPES_GENERATION_KEY, caches['responses'])
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/auth/token/login/', {
+                'email': 'author@foodgram.test', 'password': 'password'
+            })
+            self.client.post('/api/users/', {
+                'email': 'new@foodgram.test', 'username': 'new',
+                'first_name': 'Новый', 'last_name': 'Пользователь',
+                'password': 'Secret-password-42'
+            })
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(User.objects.filter(username='new').exists())
+        self.assertEqual(
+            get_version(RECIPES_GENERATION_KEY, caches['responses']),
+            generation
+        )
+
+    def test_authenticated_requests_are_not_cached(self):
+        self.client.force_authenticate(self.author)
+        self.client.get('/api/recipes/')
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/api/recipes/')
+        self.assertTrue(queries.captured_queries)
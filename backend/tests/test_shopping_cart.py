@@ -0,0 +1,95 @@
+from django.contrib.auth import get_user_model
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from food.models import (
+    AmountIngredient,
+    Ingredient,
+    Recipe,
+    ShoppingCart
+)
+
+User = get_user_model()
+
+
+class DownloadShoppingCartTest(APITestCase):
+    """Выгрузка списка покупок."""
+
+    url = '/api/recipes/download_shopping_cart/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(
+            username='cook', email='cook@foodgram.test'
+        )
+        Ingredient.objects.bulk_create(
+            Ingredient(name=name, measurement_unit=unit)
+            for name, unit in (
+                ('мука', 'г'), ('сахар', 'г'), ('молоко', 'мл')
+            )
+        )
+        ingredients = {
+            ingredient.name: ingredient
+            for ingredient in Ingredient.objects.all()
+        }
+        recipes = []
+        for name, amounts in (
+            ('Блины', {'мука': 200, 'сахар': 20, 'молоко': 500}),
+            ('Пирог', {'мука': 300, 'сахар': 150}),
+            ('Какао', {'молоко': 250}),
+        ):
+            recipe = Recipe.objects.create(
+                name=name, text=name, cooking_time=10,
+                image='food/images/test.png', author=cls.user
+            )
+            AmountIngredient.objects.bulk_create(
+                AmountIngredient(
+                    recipe=recipe,
+                    ingredient=ingredients[ingredient],
+                    amount=amount
+                ) for ingredient, amount in amounts.items()
+            )
+            recipes.append(recipe)
+        ShoppingCart.objects.bulk_create(
+            ShoppingCart(user=cls.user, recipe=recipe)
+            for recipe in recipes[:2]
+        )
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def download(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return b''.join(response.streaming_content).decode()
+
+    def test_totals_are_summed_per_ingredient(self):
+        lines = self.download().splitlines()
+        self.assertEqual(
+            lines[3:6],
+            ['1. Молоко - 500 (мл)', '2. Мука - 500 (г)', '3. Сахар - 170 (г)']
+        )
+        self.assertEqual(
+            sorted(lines[lines.index('Для следующих рецептов:') + 1:]),
+            ['Блины', 'Пирог']
+        )
+
+    def test_csv_export(self):
+        self.assertEqual(
+            self.download(file_format='csv').splitlines(),
+            [
+                'Продукт,Количество,Единица измерения',
+                'молоко,500,мл',
+                'мука,500,г',
+                'сахар,170,г',
+            ]
+        )
+
+    def test_unknown_format(self):
+        response = self.client.get(self.url, {'file_format': 'docx'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_empty_cart(self):
+        ShoppingCart.objects.all().delete()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
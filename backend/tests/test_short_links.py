@@ -0,0 +1,115 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+
+from food.models import Recipe
+from food.shortlinks import (
+    RECIPE_IDS_VERSION_KEY,
+    RecipeIdIndex,
+    decode,
+    encode,
+    recipe_ids
+)
+
+User = get_user_model()
+
+
+class ShortLinkTest(TestCase):
+    """Короткие коды рецептов и перенаправление без запросов к базе."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(
+            username='author', email='author@foodgram.test'
+        )
+        cls.recipe = cls.create_recipe()
+
+    @classmethod
+    def create_recipe(cls):
+        return Recipe.objects.create(
+            name='Блины', text='Описание', cooking_time=10,
+            author=cls.author
+        )
+
+    def setUp(self):
+        recipe_ids.rebuild()
+
+    def test_codes_round_trip(self):
+        codes = {encode(pk) for pk in range(1, 1000)}
+        self.assertEqual(len(codes), 999)
+        for pk in (1, 2, 61, 62, 10 ** 9):
+            self.assertEqual(decode(encode(pk)), pk)
+        self.assertNotEqual(encode(2)[:-1], encode(1)[:-1])
+        self.assertIsNone(decode('abc'))
+        self.assertIsNone(decode('abc-def'))
+
+    def test_redirect_without_queries(self):
+        with self.assertNumQueries(0):
+            response = self.client.get(f'/s/{encode(self.recipe.pk)}/')
+        self.assertRedirects(
+            response, f'/recipes/{self.recipe.pk}/',
+            fetch_redirect_response=False
+        )
+        with self.assertNumQueries(1):
+            response = self.client.get(f'/s/{encode(self.recipe.pk + 1)}/')
+        self.assertRedirects(
+            response, '/404/', fetch_redirect_response=False
+        )
+
+    def test_legacy_numeric_links(self):
+        self.assertRedirects(
+            self.client.get(f'/s/{self.recipe.pk}/'),
+            f'/recipes/{self.recipe.pk}/',
+            fetch_redirect_response=False
+        )
+
+    def test_get_link(self):
+        response = self.client.get(f'/api/recipes/{self.recipe.pk}/get-link/')
+        self.assertTrue(
+            response.json()['short-link'].endswith(
+                f'/s/{encode(self.recipe.pk)}/'
+            )
+        )
+        self.assertEqual(
+            self.client.get('/api/recipes/0/get-link/').status_code, 404
+        )
+
+    def test_signals_update_index(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            recipe = self.create_recipe()
+        with self.assertNumQueries(0):
+            self.assertIn(recipe.pk, recipe_ids)
+        pk = recipe.pk
+        with self.captureOnCommitCallbacks(execute=True):
+            recipe.delete()
+        with self.assertNumQueries(1):
+            self.assertNotIn(pk, recipe_ids)
+
+    def test_recipe_from_other_process_is_found(self):
+        # Рецепт создан в другом процессе: сигнал сюда не дошёл, а версия
+        # в кэше этого процесса не изменилась.
+        with self.captureOnCommitCallbacks(execute=False):
+            recipe = self.create_recipe()
+        with self.assertNumQueries(1):
+            self.assertRedirects(
+                self.client.get(f'/s/{encode(recipe.pk)}/'),
+                f'/recipes/{recipe.pk}/', fetch_redirect_response=False
+            )
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                self.client.get(
+                    f'/api/recipes/{recipe.pk}/get-link/'
+                ).status_code,
+                200
+            )
+
+    def test_other_process_rebuilds_after_change(self):
+        other = RecipeIdIndex()
+        self.assertIn(self.recipe.pk, other)
+        with self.captureOnCommitCallbacks(execute=True):
+            recipe = self.create_recipe()
+        with self.assertNumQueries(1):
+            self.assertIn(recipe.pk, other)
+        cache.delete(RECIPE_IDS_VERSION_KEY)
+        with self.assertNumQueries(1):
+            self.assertIn(recipe.pk, other)
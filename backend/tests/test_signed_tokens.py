@@ -0,0 +1,74 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from api.authentication import issue_token
+
+User = get_user_model()
+
+
+class SignedTokenTest(APITestCase):
+    """Вход по подписанным токенам без запроса пользователя к базе."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(
+            username='reader', email='reader@foodgram.test'
+        )
+        cls.user.set_password('password')
+        cls.user.save()
+
+    def setUp(self):
+        cache.clear()
+
+    def login(self):
+        return self.client.post('/api/auth/token/login/', {
+            'email': 'reader@foodgram.test', 'password': 'password'
+        })
+
+    def authorize(self, token):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token}')
+
+    def test_login_issues_signed_token(self):
+        token = self.login().json()['auth_token']
+        self.assertEqual(token.count('.'), 2)
+        self.assertFalse(Token.objects.exists())
+        self.authorize(token)
+        self.assertEqual(
+            self.client.get('/api/users/me/').json()['id'], self.user.pk
+        )
+
+    def test_reads_skip_user_query(self):
+        self.authorize(issue_token(self.user))
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/users/subscriptions/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_invalid_token(self):
+        token = issue_token(self.user)
+        self.authorize(token[:-1] + ('a' if token[-1] != 'a' else 'b'))
+        self.assertEqual(self.client.get('/api/users/me/').status_code, 401)
+
+    def test_logout_revokes_token(self):
+        self.authorize(self.login().json()['auth_token'])
+        self.assertEqual(
+            self.client.post('/api/auth/token/logout/').status_code, 204
+        )
+        self.assertEqual(self.client.get('/api/users/me/').status_code, 401)
+
+    def test_deleted_user(self):
+        token = issue_token(self.user)
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.authorize(token)
+        self.assertEqual(self.client.get('/api/users/me/').status_code, 401)
+
+    def test_database_tokens_still_work(self):
+        self.authorize(Token.objects.create(user=self.user).key)
+        self.assertEqual(self.client.get('/api/users/me/').status_code, 200)
+
+    @override_settings(SIGNED_TOKENS=False)
+    def test_database_tokens_mode(self):
+        token = self.login().json()['auth_token']
+        self.assertEqual(Token.objects.get().key, token)
@@ -0,0 +1,76 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from food.models import Recipe, Subscription
+
+User = get_user_model()
+
+
+class SubscriptionsTest(APITestCase):
+    """Список подписок."""
+
+    url = '/api/users/subscriptions/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(
+            username='reader', email='reader@foodgram.test'
+        )
+        for index, recipes_count in enumerate((5, 2, 0)):
+            author = User.objects.create(
+                username=f'author{index}',
+                email=f'author{index}@foodgram.test'
+            )
+            Recipe.objects.bulk_create(
+                Recipe(
+                    name=f'Рецепт {number}', text='Описание',
+                    cooking_time=10, image='food/images/test.png',
+                    author=author
+                ) for number in range(recipes_count)
+            )
+            Subscription.objects.create(user=cls.user, author=author)
+        call_command('recount', stdout=StringIO())
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def test_recipes_limit(self):
+        response = self.client.get(self.url, {'recipes_limit': 3})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        authors = {
+            author['username']: author
+            for author in response.data['results']
+        }
+        self.assertEqual(
+            {
+                username: (
+                    len(author['recipes']),
+                    author['recipes_count'],
+                    author['is_subscribed']
+                )
+                for username, author in authors.items()
+            },
+            {
+                'author0': (3, 5, True),
+                'author1': (2, 2, True),
+                'author2': (0, 0, True),
+            }
+        )
+
+    def test_without_recipes_limit(self):
+        response = self.client.get(self.url)
+        self.assertEqual(
+            sorted(
+                len(author['recipes'])
+                for author in response.data['results']
+            ),
+            [0, 2, 5]
+        )
+
+    def test_invalid_recipes_limit(self):
+        response = self.client.get(self.url, {'recipes_limit': 'all'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
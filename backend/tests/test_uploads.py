@@ -0,0 +1,117 @@
+import shutil
+import tempfile
+from io import BytesIO
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from PIL import Image
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from food.models import Ingredient, Recipe, Tag
+
+from .test_renditions import make_image
+
+User = get_user_model()
+MEDIA_ROOT = tempfile.mkdtemp()
+AVATAR_URL = '/api/users/me/avatar/'
+
+
+def png(width=8, height=8):
+    buffer = BytesIO()
+    Image.new('RGB', (width, height), 'green').save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class UploadTest(APITestCase):
+    """Загрузка изображений в base64, multipart-формой и телом запроса."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(
+            username='cook', email='cook@foodgram.test'
+        )
+        cls.ingredient = Ingredient.objects.create(
+            name='мука', measurement_unit='г'
+        )
+        cls.tag = Tag.objects.create(name='Завтрак', slug='breakfast')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def avatar(self):
+        return User.objects.get(pk=self.user.pk).avatar
+
+    def test_avatar_from_raw_body(self):
+        response = self.client.put(
+            AVATAR_URL, png(), content_type='image/png'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(self.avatar().name.endswith('.png'))
+
+    def test_avatar_from_multipart(self):
+        response = self.client.put(
+            AVATAR_URL,
+            {'avatar': SimpleUploadedFile('me.png', png(), 'image/png')},
+            format='multipart'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('me.png', self.avatar().name)
+
+    @override_settings(MAX_IMAGE_UPLOAD_SIZE=16)
+    def test_raw_body_too_large(self):
+        response = self.client.put(
+            AVATAR_URL, png(), content_type='image/png'
+        )
+        self.assertEqual(
+            response.status_code, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+        )
+
+    @override_settings(MAX_IMAGE_UPLOAD_SIZE=16)
+    def test_base64_too_large(self):
+        response = self.client.put(
+            AVATAR_URL, {'avatar': make_image(8, 8)}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(MAX_IMAGE_PIXELS=100)
+    def test_too_many_pixels(self):
+        response = self.client.put(
+            AVATAR_URL, {'avatar': make_image(20, 20)}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(self.avatar())
+
+    def test_not_an_image(self):
+        response = self.client.put(
+            AVATAR_URL, b'not an image', content_type='image/png'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_recipe_from_multipart(self):
+        response = self.client.post(
+            '/api/recipes/',
+            {
+                'name': 'Блины',
+                'text': 'Описание',
+                'cooking_time': 10,
+                'image': SimpleUploadedFile('pie.png', png(), 'image/png'),
+                'tags': [self.tag.pk],
+                'ingredients[0]id': self.ingredient.pk,
+                'ingredients[0]amount': 200,
+            },
+            format='multipart'
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        recipe = Recipe.objects.get(pk=response.data['id'])
+        self.assertEqual(
+            list(recipe.amounts.values_list('ingredient', 'amount')),
+            [(self.ingredient.pk, 200)]
+        )